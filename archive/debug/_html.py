@@ -0,0 +1,36 @@
+"""
+Shared lxml helpers for the debug and enrichment scripts
+"""
+from pathlib import Path
+import mmap
+import lxml.html
+from lxml import etree
+
+# Ein Parser-Objekt für alle HTML-Dateien
+HTML_PARSER = lxml.html.HTMLParser(encoding="iso-8859-1")
+_TEXT_XPATH = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]")
+
+def read_html(path: Path):
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return lxml.html.document_fromstring(data, parser=HTML_PARSER)
+
+def stripped_strings(element):
+    """lxml equivalent of BeautifulSoup's ``stripped_strings``"""
+    for text in _TEXT_XPATH(element):
+        text = text.strip()
+        if text:
+            yield text
+
+def find_bold(tree, pattern):
+    """First <b> tag whose text matches ``pattern``"""
+    for bold in tree.iter("b"):
+        if pattern.search(bold.text_content()):
+            return bold
+    return None
+
+def find_text(tree, pattern):
+    """Element containing the first text node that matches ``pattern``"""
+    for text in _TEXT_XPATH(tree):
+        if pattern.search(text):
+            return text.getparent().getparent() if text.is_tail else text.getparent()
+    return None
@@ -0,0 +1,38 @@
+"""
+Shared precompiled regex patterns for the debug and enrichment scripts
+"""
+import re
+
+WS = re.compile(r"\s+")
+NON_ALNUM = re.compile(r"[^A-Za-z0-9 ]+")
+
+# Header-Suche in Profil- und Spielberichtsseiten
+POSITION_HDR = re.compile("Position", re.IGNORECASE)
+NATIONALITY_HDR = re.compile(r"Nationalit[aä]t", re.IGNORECASE)
+ZUSCHAUER = re.compile(r"Zuschauer", re.IGNORECASE)
+HT_SCORE = re.compile(r"(\d+):(\d+)\s*\((\d+):(\d+)\)")
+
+# Größe und Gewicht in einem Durchlauf über den Profiltext
+PROFILE_RE = re.compile(
+    r"(?P<height>\d{2,3})\s*cm"
+    r"|(?P<weight>\d{2,3})\s*kg"
+)
+# Geburtsdatum/-ort separat: muss über Zeilenumbrüche hinweg passen (DOTALL)
+BIRTH_RE = re.compile(
+    r"\*.*?(?P<birth_date>\d{2}\.\d{2}\.\d{4}).*?in\s+(?P<birth_place>[^,\n]+)", re.DOTALL
+)
+
+def normalize_whitespace(value: str) -> str:
+    return WS.sub(" ", value.strip())
+
+def scan_profile(information: str) -> dict:
+    """First match per field name: height/weight in one PROFILE_RE pass, birth via BIRTH_RE"""
+    found = {}
+    for match in PROFILE_RE.finditer(information):
+        for field, value in match.groupdict().items():
+            if value is not None and field not in found:
+                found[field] = match
+    birth_match = BIRTH_RE.search(information)
+    if birth_match:
+        found["birth_date"] = found["birth_place"] = birth_match
+    return found
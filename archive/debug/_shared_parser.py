@@ -0,0 +1,65 @@
+"""
+Shared parser setup for the parsing test scripts
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from comprehensive_fsv_parser import ComprehensiveFSVParser
+
+def player_index_cache(base_path: Path) -> Path:
+    """player_file_index for base_path as JSON, kept in the user's cache directory
+
+    The file name is keyed by the resolved base_path so different archives never
+    share a cache; it is reused until the spieler directory changes.
+    """
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "fsv_archive"
+    key = hashlib.sha1(str(Path(base_path).resolve()).encode()).hexdigest()[:16]
+    return cache_dir / f"player_index_{key}.json"
+
+# Indexes already loaded in this process, so each test's parser reuses them
+_SESSION_INDEX = {}
+
+class CachedIndexParser(ComprehensiveFSVParser):
+    """Parser that loads player_file_index from disk instead of scanning spieler/"""
+
+    def build_player_index(self):
+        if self.base_path in _SESSION_INDEX:
+            return dict(_SESSION_INDEX[self.base_path])
+
+        player_dir = self.base_path / "spieler"
+        cache = player_index_cache(self.base_path)
+        if (
+            player_dir.exists()
+            and cache.exists()
+            and cache.stat().st_mtime >= player_dir.stat().st_mtime
+        ):
+            with cache.open(encoding="utf-8") as handle:
+                index = {name: Path(path) for name, path in json.load(handle).items()}
+        else:
+            index = super().build_player_index()
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            with cache.open("w", encoding="utf-8") as handle:
+                json.dump({name: str(path) for name, path in index.items()}, handle)
+
+        _SESSION_INDEX[self.base_path] = index
+        return dict(index)
+
+def make_test_parser() -> ComprehensiveFSVParser:
+    """Create a parser on a fresh throwaway database
+
+    The database lives in memory unless TEST_DB names a file to keep for inspection.
+    """
+    test_db = os.environ.get("TEST_DB", ":memory:")
+
+    # An existing TEST_DB file is reused: DatabaseManager drops and recreates
+    # every table on connect, so there is no need to unlink it first
+    parser = CachedIndexParser(
+        base_path="fsvarchiv",
+        db_name=test_db
+    )
+
+    # Memory-map file databases and keep 64 MB of pages cached
+    parser.db.conn.execute("PRAGMA mmap_size=268435456")
+    parser.db.conn.execute("PRAGMA cache_size=-65536")
+    return parser
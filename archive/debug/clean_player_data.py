@@ -6,59 +6,111 @@ import sqlite3
 import re
 from pathlib import Path
 
+FETCH_BATCH_SIZE = 10000
+
+# Ungültige Spielernamen direkt in SQLite filtern: GLOB für die einfachen
+# Fälle, eine Python-Funktion (invalid_name_reason) für den Rest. Normale
+# Namen werden per Zeichenvergleich aussortiert, bevor Python aufgerufen wird.
+INVALID_PLAYERS_SQL = '''
+    SELECT player_id, name, reason
+    FROM (
+        SELECT
+            player_id,
+            name,
+            CASE
+                WHEN name GLOB '[0-9]*' AND name NOT GLOB '*[^0-9]*' THEN 'Nur Zahlen'
+                WHEN name GLOB '-*' AND name NOT GLOB '*[^-]*' THEN 'Nur Bindestriche'
+                WHEN name GLOB '(*)' THEN 'Nur Klammern'
+                -- Nur Namen, die mit Ziffer/Komma beginnen oder ein Komma an
+                -- dritter Stelle haben (FE/HE/ET/EL), gehen an die Regex
+                WHEN name GLOB '[0-9,]*' OR substr(name, 3, 1) = ','
+                    THEN invalid_name_reason(name)
+            END AS reason
+        FROM players
+    )
+    WHERE reason IS NOT NULL
+    ORDER BY player_id
+'''
+
+# Restliche Muster als eine Alternation: ein Durchlauf pro Name statt drei
+INVALID_NAME_RE = re.compile(
+    r'(?P<goal_time>\d+\.\s+\d+:\d+)'
+    r'|(?P<goal_description>(?:FE|HE|ET|EL),\s)'
+    r'|(?P<assist>,\s+.+\s+an\s+)'
+)
+INVALID_NAME_REASONS = {
+    'goal_time': 'Tor-Zeit-Format',
+    'goal_description': 'Tor-Beschreibung (FE/HE/ET)',
+    'assist': 'Assist-Beschreibung',
+}
+
+def invalid_name_reason(name: str):
+    """Beschreibung des ersten passenden Musters oder None"""
+    match = INVALID_NAME_RE.match(name) if name else None
+    return INVALID_NAME_REASONS[match.lastgroup] if match else None
+
 def clean_player_data(db_path: str):
     """Clean invalid player entries from database"""
     
     conn = sqlite3.connect(db_path)
+    conn.create_function('invalid_name_reason', 1, invalid_name_reason, deterministic=True)
     cursor = conn.cursor()
     
+    # Indizes für Referenz-Prüfung, Profil-Filter und Namens-Varianten
+    cursor.executescript('''
+        CREATE INDEX IF NOT EXISTS idx_players_norm ON players(normalized_name);
+        CREATE INDEX IF NOT EXISTS idx_players_profile_null ON players(player_id)
+            WHERE nationality IS NULL AND height_cm IS NULL;
+        CREATE INDEX IF NOT EXISTS idx_lineups_player ON match_lineups(player_id);
+        CREATE INDEX IF NOT EXISTS idx_goals_player ON goals(player_id);
+        CREATE INDEX IF NOT EXISTS idx_goals_assist ON goals(assist_player_id);
+        ANALYZE;
+    ''')
+    
     print('='*80)
     print('SPIELER-DATENBEREINIGUNG')
     print('='*80)
     
     # 1. Identifiziere ungültige Spieler
-    invalid_patterns = [
-        (r'^\d+$', 'Nur Zahlen'),
-        (r'^-+$', 'Nur Bindestriche'),
-        (r'^\d+\.\s+\d+:\d+', 'Tor-Zeit-Format'),
-        (r'^(FE|HE|ET|EL),\s', 'Tor-Beschreibung (FE/HE/ET)'),
-        (r',\s+.+\s+an\s+', 'Assist-Beschreibung'),
-        (r'^\(.*\)$', 'Nur Klammern'),
-    ]
-    
     to_delete = set()
     
     print('\nIdentifiziere ungültige Einträge:')
     print('-'*80)
     
-    cursor.execute('SELECT player_id, name FROM players')
-    all_players = cursor.fetchall()
+    cursor.execute(INVALID_PLAYERS_SQL)
     
-    for pid, name in all_players:
-        for pattern, description in invalid_patterns:
-            if re.match(pattern, name):
-                to_delete.add(pid)
-                print(f'  ID {pid}: "{name}" - {description}')
-                break
+    # In Blöcken streamen statt die Ergebnismenge komplett zu materialisieren
+    for batch in iter(lambda: cursor.fetchmany(FETCH_BATCH_SIZE), []):
+        for pid, name, description in batch:
+            to_delete.add(pid)
+            print(f'  ID {pid}: "{name}" - {description}')
     
     print(f'\nGefunden: {len(to_delete)} ungültige Spieler-Einträge')
     
     if to_delete:
         # Prüfe ob diese Spieler in anderen Tabellen referenziert werden
-        cursor.execute(f'''
-            SELECT COUNT(*)
-            FROM match_lineups
-            WHERE player_id IN ({','.join('?' * len(to_delete))})
-        ''', list(to_delete))
-        lineup_refs = cursor.fetchone()[0]
-        
-        cursor.execute(f'''
-            SELECT COUNT(*)
-            FROM goals
-            WHERE player_id IN ({','.join('?' * len(to_delete))})
-            OR assist_player_id IN ({','.join('?' * len(to_delete))})
-        ''', list(to_delete) * 2)
-        goal_refs = cursor.fetchone()[0]
+        # (Zähler und Beispiele in einer Abfrage über die temporäre ID-Tabelle)
+        cursor.execute('CREATE TEMP TABLE del_ids (pid INTEGER PRIMARY KEY)')
+        cursor.executemany('INSERT INTO del_ids VALUES (?)', [(pid,) for pid in to_delete])
+        cursor.execute('''
+            WITH samples AS (
+                SELECT l.lineup_id, p.name, m.source_file
+                FROM match_lineups l
+                JOIN players p ON l.player_id = p.player_id
+                JOIN matches m ON l.match_id = m.match_id
+                WHERE l.player_id IN del_ids
+                LIMIT 5
+            )
+            SELECT
+                (SELECT COUNT(*) FROM match_lineups WHERE player_id IN del_ids),
+                (SELECT COUNT(*) FROM goals
+                 WHERE player_id IN del_ids OR assist_player_id IN del_ids),
+                s.lineup_id, s.name, s.source_file
+            FROM (SELECT 1)
+            LEFT JOIN samples s
+        ''')
+        rows = cursor.fetchall()
+        lineup_refs, goal_refs = rows[0][0], rows[0][1]
         
         print(f'\nReferenzen:')
         print(f'  In match_lineups: {lineup_refs}')
@@ -70,17 +122,9 @@ def clean_player_data(db_path: str):
             
             # Zeige Beispiele
             print('\nBeispiele aus match_lineups:')
-            cursor.execute(f'''
-                SELECT l.lineup_id, p.name, m.source_file
-                FROM match_lineups l
-                JOIN players p ON l.player_id = p.player_id
-                JOIN matches m ON l.match_id = m.match_id
-                WHERE l.player_id IN ({','.join('?' * min(5, len(to_delete)))})
-                LIMIT 5
-            ''', list(to_delete)[:5])
-            
-            for lid, name, source in cursor.fetchall():
-                print(f'    Lineup {lid}: "{name}" in {source}')
+            for _, _, lid, name, source in rows:
+                if lid is not None:
+                    print(f'    Lineup {lid}: "{name}" in {source}')
         else:
             print('\n✓ Keine Referenzen gefunden - sicher zu löschen')
     
@@ -111,26 +155,45 @@ def clean_player_data(db_path: str):
         print(f'  ID {pid:>5}: "{name:<30}" - {apps:>3} Einsätze, Profil: {"FEHLT" if not nat and not height else "OK"}')
     
     # 3. Statistik über Namens-Varianten
+    # Kürzen (max. 100 Zeichen) bereits in SQLite; Profil-Statistik für die
+    # Zusammenfassung kommt in derselben Abfrage mit
     cursor.execute('''
-        SELECT 
-            normalized_name,
-            COUNT(*) as variants,
-            GROUP_CONCAT(name, ' | ') as names
-        FROM players
-        GROUP BY normalized_name
-        HAVING COUNT(*) > 1
-        ORDER BY COUNT(*) DESC
-        LIMIT 10
+        WITH stats AS (
+            SELECT COUNT(*) AS total, COUNT(nationality) AS has_nat
+            FROM players
+        ),
+        variants AS (
+            SELECT 
+                normalized_name,
+                COUNT(*) as variants,
+                GROUP_CONCAT(name, ' | ') as names
+            FROM players
+            GROUP BY normalized_name
+            HAVING COUNT(*) > 1
+            ORDER BY COUNT(*) DESC
+            LIMIT 10
+        )
+        SELECT
+            stats.total,
+            stats.has_nat,
+            v.normalized_name,
+            v.variants,
+            CASE WHEN length(v.names) < 100 THEN v.names
+                 ELSE substr(v.names, 1, 97) || '...' END
+        FROM stats
+        LEFT JOIN variants v
+        ORDER BY v.variants DESC
     ''')
+    rows = cursor.fetchall()
+    total, has_nat = rows[0][0], rows[0][1]
     
     print('\n' + '='*80)
     print('SPIELER MIT MEHREREN NAMENS-VARIANTEN:')
     print('='*80)
     
-    for norm_name, count, names in cursor.fetchall():
-        # Truncate if too long
-        names_display = names if len(names) < 100 else names[:97] + '...'
-        print(f'  "{norm_name}" ({count} Varianten): {names_display}')
+    for _, _, norm_name, count, names_display in rows:
+        if norm_name is not None:
+            print(f'  "{norm_name}" ({count} Varianten): {names_display}')
     
     conn.close()
     
@@ -139,7 +202,7 @@ def clean_player_data(db_path: str):
     print('='*80)
     print(f'  • {len(to_delete)} ungültige Einträge gefunden')
     print(f'  • {len(missing_profile_data)} häufige Spieler ohne Profil-Daten')
-    print(f'  • Nur {100*has_nat/total:.1f}% der Spieler haben vollständige Profile')
+    print(f'  • Nur {100*has_nat/total if total else 0:.1f}% der Spieler haben vollständige Profile')
 
 if __name__ == '__main__':
     clean_player_data('fsv_archive_complete.db')
@@ -0,0 +1,22 @@
+"""
+Shared fixtures for the parsing tests
+"""
+import sys
+from pathlib import Path
+import pytest
+
+# comprehensive_fsv_parser lives in the top-level parsing/ directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "parsing"))
+
+from _shared_parser import make_test_parser
+
+@pytest.fixture
+def parser():
+    """A parser on its own fresh database for each test
+
+    The player index is only built once per session (see _shared_parser), so a
+    new parser per test is cheap and no test sees another test's rows.
+    """
+    parser = make_test_parser()
+    yield parser
+    parser.db.conn.close()
@@ -3,18 +3,15 @@
 Debug script to check match detail parsing
 """
 from pathlib import Path
-from bs4 import BeautifulSoup
-import re
 from datetime import datetime
+from _html import find_text, read_html, stripped_strings
+from _patterns import HT_SCORE, ZUSCHAUER, normalize_whitespace
 
-def normalize_whitespace(value: str) -> str:
-    return re.sub(r"\s+", " ", value.strip())
+# Tausender-Trenner in einem Durchlauf entfernen
+_STRIP_SEPS = str.maketrans("", "", ".,")
 
 def parse_int(value: str) -> int:
-    value = value.strip()
-    if not value:
-        return None
-    value = value.replace(".", "").replace(",", "")
+    value = value.strip().translate(_STRIP_SEPS)
     if value.isdigit():
         return int(value)
     return None
@@ -40,8 +37,7 @@ def test_match_parsing():
             print(f"ERROR: File not found: {full_path}")
             continue
         
-        with full_path.open("r", encoding="latin-1", errors="ignore") as f:
-            soup = BeautifulSoup(f.read(), "lxml")
+        tree = read_html(full_path)
         
         # Extract match details
         info = {
@@ -52,11 +48,11 @@ def test_match_parsing():
         }
         
         # Find the header line with attendance info
-        header_line = soup.find(string=re.compile(r"Zuschauer", re.IGNORECASE))
+        header_container = find_text(tree, ZUSCHAUER)
         
-        if header_line:
+        if header_container is not None:
             print("\n✓ Found 'Zuschauer' line")
-            container_text = header_line.parent.get_text(" ", strip=True) if header_line.parent else header_line
+            container_text = " ".join(stripped_strings(header_container))
             text = normalize_whitespace(container_text)
             print(f"  Raw text: '{text}'")
             
@@ -98,13 +94,13 @@ def test_match_parsing():
         
         # Parse halftime score from header
         print("\n--- Halftime Score Parsing ---")
-        header = soup.find("b")
-        if header:
-            header_text = header.get_text(strip=True)
+        header = tree.find(".//b")
+        if header is not None:
+            header_text = "".join(stripped_strings(header))
             print(f"Header text: '{header_text}'")
             
             # Look for pattern like "2:1 (0:1)"
-            halftime_match = re.search(r"(\d+):(\d+)\s*\((\d+):(\d+)\)", header_text)
+            halftime_match = HT_SCORE.search(header_text)
             if halftime_match:
                 full_home = int(halftime_match.group(1))
                 full_away = int(halftime_match.group(2))
@@ -3,12 +3,10 @@
 Debug script to check player profile parsing
 """
 from pathlib import Path
-from bs4 import BeautifulSoup
 import re
 import unicodedata
-
-def normalize_whitespace(value: str) -> str:
-    return re.sub(r"\s+", " ", value.strip())
+from _html import find_bold, read_html, stripped_strings
+from _patterns import NATIONALITY_HDR, NON_ALNUM, POSITION_HDR, normalize_whitespace, scan_profile
 
 def strip_accents(value: str) -> str:
     normalized = unicodedata.normalize("NFKD", value)
@@ -16,7 +14,7 @@ def strip_accents(value: str) -> str:
 
 def normalize_name(name: str) -> str:
     cleaned = strip_accents(name).replace(".", " ").replace("-", " ")
-    cleaned = re.sub(r"[^A-Za-z0-9 ]+", " ", cleaned)
+    cleaned = NON_ALNUM.sub(" ", cleaned)
     return normalize_whitespace(cleaned).lower()
 
 def test_brosinski_parsing():
@@ -30,24 +28,25 @@ def test_brosinski_parsing():
     
     print(f"Reading file: {player_file}")
     
-    with player_file.open("r", encoding="latin-1", errors="ignore") as f:
-        soup = BeautifulSoup(f.read(), "lxml")
+    tree = read_html(player_file)
     
     # Get all text for debugging
-    information = soup.get_text("\n", strip=True)
+    information = "\n".join(stripped_strings(tree))
     
     print("\n" + "="*80)
     print("FULL TEXT CONTENT (first 1000 chars):")
     print("="*80)
     print(information[:1000])
     
+    profile_matches = scan_profile(information)
+    
     # Test height parsing
     print("\n" + "="*80)
     print("HEIGHT PARSING:")
     print("="*80)
-    height_match = re.search(r"(\d{2,3})\s*cm", information)
+    height_match = profile_matches.get("height")
     if height_match:
-        print(f"✓ Found height: {height_match.group(1)} cm")
+        print(f"✓ Found height: {height_match.group('height')} cm")
         print(f"  Match: '{height_match.group(0)}'")
     else:
         print("✗ Height not found")
@@ -62,9 +61,9 @@ def test_brosinski_parsing():
     print("\n" + "="*80)
     print("WEIGHT PARSING:")
     print("="*80)
-    weight_match = re.search(r"(\d{2,3})\s*kg", information)
+    weight_match = profile_matches.get("weight")
     if weight_match:
-        print(f"✓ Found weight: {weight_match.group(1)} kg")
+        print(f"✓ Found weight: {weight_match.group('weight')} kg")
         print(f"  Match: '{weight_match.group(0)}'")
     else:
         print("✗ Weight not found")
@@ -79,14 +78,14 @@ def test_brosinski_parsing():
     print("\n" + "="*80)
     print("POSITION PARSING:")
     print("="*80)
-    position_header = soup.find("b", string=re.compile("Position", re.IGNORECASE))
+    position_header = find_bold(tree, POSITION_HDR)
     primary_position = None
-    if position_header:
-        print(f"✓ Found position header: '{position_header.string}'")
-        parent = position_header.find_parent()
-        if parent:
+    if position_header is not None:
+        print(f"✓ Found position header: '{position_header.text}'")
+        parent = position_header.getparent()
+        if parent is not None:
             found_header = False
-            for string in parent.stripped_strings:
+            for string in stripped_strings(parent):
                 if found_header and string and not string.endswith(":"):
                     primary_position = normalize_whitespace(string)
                     break
@@ -97,30 +96,30 @@ def test_brosinski_parsing():
             else:
                 print("✗ Position value not found after header")
                 print("  Parent strings:")
-                for i, s in enumerate(parent.stripped_strings):
+                for i, s in enumerate(stripped_strings(parent)):
                     print(f"    {i}: '{s}'")
         else:
             print("✗ Position parent not found")
     else:
         print("✗ Position header not found")
         # Search for any bold tags
-        bold_tags = soup.find_all("b")
+        bold_tags = list(tree.iter("b"))
         print(f"  Found {len(bold_tags)} <b> tags:")
         for tag in bold_tags[:10]:
-            print(f"    - '{tag.string}'")
+            print(f"    - '{tag.text}'")
     
     # Test nationality parsing
     print("\n" + "="*80)
     print("NATIONALITY PARSING:")
     print("="*80)
-    nationality_header = soup.find("b", string=re.compile(r"Nationalit[aä]t", re.IGNORECASE))
+    nationality_header = find_bold(tree, NATIONALITY_HDR)
     nationality = None
-    if nationality_header:
-        print(f"✓ Found nationality header: '{nationality_header.string}'")
-        parent = nationality_header.find_parent()
-        if parent:
+    if nationality_header is not None:
+        print(f"✓ Found nationality header: '{nationality_header.text}'")
+        parent = nationality_header.getparent()
+        if parent is not None:
             found_header = False
-            for string in parent.stripped_strings:
+            for string in stripped_strings(parent):
                 if found_header and string and not string.endswith(":"):
                     nationality = normalize_whitespace(string)
                     break
@@ -131,7 +130,7 @@ def test_brosinski_parsing():
             else:
                 print("✗ Nationality value not found after header")
                 print("  Parent strings:")
-                for i, s in enumerate(parent.stripped_strings):
+                for i, s in enumerate(stripped_strings(parent)):
                     print(f"    {i}: '{s}'")
         else:
             print("✗ Nationality parent not found")
@@ -4,13 +4,10 @@ Smart player enrichment - match short names with full names
 """
 import sqlite3
 from pathlib import Path
-from bs4 import BeautifulSoup
-import re
 import unicodedata
 from datetime import datetime
-
-def normalize_whitespace(value: str) -> str:
-    return re.sub(r"\s+", " ", value.strip())
+from _html import read_html as _read_html
+from _patterns import NON_ALNUM, normalize_whitespace
 
 def strip_accents(value: str) -> str:
     normalized = unicodedata.normalize("NFKD", value)
@@ -18,7 +15,7 @@ def strip_accents(value: str) -> str:
 
 def normalize_name(name: str) -> str:
     cleaned = strip_accents(name).replace(".", " ").replace("-", " ")
-    cleaned = re.sub(r"[^A-Za-z0-9 ]+", " ", cleaned)
+    cleaned = NON_ALNUM.sub(" ", cleaned)
     return normalize_whitespace(cleaned).lower()
 
 def extract_last_name(name: str) -> str:
@@ -32,113 +29,120 @@ def read_html(path: Path):
     if not path.exists():
         return None
     try:
-        with path.open("r", encoding="latin-1", errors="ignore") as handle:
-            return BeautifulSoup(handle.read(), "lxml")
-    except OSError:
+        return _read_html(path)
+    except (OSError, ValueError):
         return None
 
 def enrich_players_smart(db_path: str, base_path: str = "fsvarchiv"):
     """Match and enrich players using smart name matching"""
     
     conn = sqlite3.connect(db_path)
+    # Alle Updates in einer expliziten Transaktion, ohne fsync pro Statement
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-200000')
+    conn.execute('BEGIN IMMEDIATE')
+    conn.create_function('last_name', 1, extract_last_name, deterministic=True)
     cursor = conn.cursor()
     
+    # Indizes für Profil-Filter und Einsatz-Lookup
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_players_profile_null ON players(player_id)
+        WHERE nationality IS NULL AND height_cm IS NULL
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_lineups_player ON match_lineups(player_id)')
+    
     print('='*80)
     print('INTELLIGENTES SPIELER-ENRICHMENT')
     print('='*80)
     
-    # 1. Baue Index: last_name -> [player_ids with profile data]
+    # 1./2. Ein Durchlauf über players: Nachname und Profil-Status je Spieler
     cursor.execute('''
-        SELECT player_id, name, normalized_name
+        CREATE TEMP TABLE player_last_names AS
+        SELECT player_id, name, normalized_name, last_name(name) AS last_name,
+               birth_date, birth_place, height_cm, weight_kg,
+               primary_position, nationality, image_url, profile_url,
+               (nationality IS NULL AND height_cm IS NULL) AS missing
         FROM players
         WHERE nationality IS NOT NULL OR height_cm IS NOT NULL
+        OR player_id IN (SELECT DISTINCT player_id FROM match_lineups)
     ''')
+    cursor.execute('CREATE INDEX idx_player_last_names_last ON player_last_names(last_name)')
     
-    profile_index = {}  # lastname -> [(player_id, full_name)]
-    for pid, name, norm_name in cursor.fetchall():
-        last_name = extract_last_name(name)
-        if last_name:
-            profile_index.setdefault(last_name, []).append((pid, name, norm_name))
-    
-    print(f'\n1. Index erstellt: {len(profile_index)} unterschiedliche Nachnamen mit Profil-Daten')
+    # Spieler mit Profil-Daten (Quelle) bzw. ohne Profil-Daten, aber mit Einsätzen (Ziel)
+    cursor.execute('''
+        CREATE TEMP VIEW profile_source AS
+        SELECT * FROM player_last_names WHERE NOT missing AND last_name <> ''
+    ''')
+    cursor.execute('''
+        CREATE TEMP VIEW missing_profile AS
+        SELECT player_id, name, normalized_name, last_name
+        FROM player_last_names
+        WHERE missing
+    ''')
     
-    # 2. Finde Spieler ohne Profil-Daten
     cursor.execute('''
-        SELECT player_id, name, normalized_name
-        FROM players
-        WHERE nationality IS NULL AND height_cm IS NULL
-        AND player_id IN (SELECT DISTINCT player_id FROM match_lineups)
+        SELECT
+            COUNT(DISTINCT CASE WHEN NOT missing AND last_name <> '' THEN last_name END),
+            COALESCE(SUM(missing), 0)
+        FROM player_last_names
     ''')
+    indexed_last_names, missing_count = cursor.fetchone()
     
-    players_without_profile = cursor.fetchall()
-    print(f'2. Gefunden: {len(players_without_profile)} Spieler ohne Profil-Daten (aber mit Einsätzen)')
+    print(f'\n1. Index erstellt: {indexed_last_names} unterschiedliche Nachnamen mit Profil-Daten')
+    print(f'2. Gefunden: {missing_count} Spieler ohne Profil-Daten (aber mit Einsätzen)')
     
     # 3. Matche sie
-    matches_found = 0
-    enriched = 0
-    
     print(f'\n3. Matching läuft...')
     
-    for pid, name, norm_name in players_without_profile:
-        # Extract last name from this player
-        last_name = extract_last_name(name)
-        
-        if not last_name or last_name not in profile_index:
-            continue
-        
-        # Found potential matches
-        candidates = profile_index[last_name]
-        
-        if len(candidates) == 1:
-            # Exact last name match with only one candidate - very likely correct
-            source_pid, source_name, source_norm = candidates[0]
-            
-            # Copy data from source player
-            cursor.execute('''
-                UPDATE players
-                SET 
-                    birth_date = (SELECT birth_date FROM players WHERE player_id = ?),
-                    birth_place = (SELECT birth_place FROM players WHERE player_id = ?),
-                    height_cm = (SELECT height_cm FROM players WHERE player_id = ?),
-                    weight_kg = (SELECT weight_kg FROM players WHERE player_id = ?),
-                    primary_position = (SELECT primary_position FROM players WHERE player_id = ?),
-                    nationality = (SELECT nationality FROM players WHERE player_id = ?),
-                    image_url = (SELECT image_url FROM players WHERE player_id = ?),
-                    profile_url = (SELECT profile_url FROM players WHERE player_id = ?)
-                WHERE player_id = ?
-            ''', (source_pid,) * 8 + (pid,))
-            
-            enriched += 1
-            matches_found += 1
-            
-            if enriched <= 10:
-                print(f'  ✓ "{name}" <- "{source_name}"')
-        
-        elif len(candidates) > 1:
-            # Multiple candidates - try to match by checking if short name is contained
-            for source_pid, source_name, source_norm in candidates:
-                # Check if the short name matches the beginning or end of full name
-                if norm_name in source_norm or source_norm.endswith(norm_name):
-                    cursor.execute('''
-                        UPDATE players
-                        SET 
-                            birth_date = (SELECT birth_date FROM players WHERE player_id = ?),
-                            birth_place = (SELECT birth_place FROM players WHERE player_id = ?),
-                            height_cm = (SELECT height_cm FROM players WHERE player_id = ?),
-                            weight_kg = (SELECT weight_kg FROM players WHERE player_id = ?),
-                            primary_position = (SELECT primary_position FROM players WHERE player_id = ?),
-                            nationality = (SELECT nationality FROM players WHERE player_id = ?),
-                            image_url = (SELECT image_url FROM players WHERE player_id = ?),
-                            profile_url = (SELECT profile_url FROM players WHERE player_id = ?)
-                        WHERE player_id = ?
-                    ''', (source_pid,) * 8 + (pid,))
-                    
-                    enriched += 1
-                    matches_found += 1
-                    
-                    if enriched <= 10:
-                        print(f'  ✓ "{name}" <- "{source_name}" (multi-match)')
-                    break
+    # Genau ein Kandidat mit gleichem Nachnamen -> sehr wahrscheinlich korrekt.
+    # Mehrere Kandidaten -> erster, dessen normalisierter Name den Kurznamen enthält.
+    cursor.execute('''
+        CREATE TEMP TABLE profile_matches AS
+        SELECT *
+        FROM (
+            SELECT *, ROW_NUMBER() OVER (PARTITION BY target_id ORDER BY player_id) AS rn
+            FROM (
+                SELECT
+                    mp.player_id AS target_id,
+                    mp.name AS target_name,
+                    mp.normalized_name AS target_norm,
+                    ps.*,
+                    COUNT(*) OVER (PARTITION BY mp.player_id) AS candidates
+                FROM missing_profile mp
+                JOIN profile_source ps ON ps.last_name = mp.last_name
+            )
+            WHERE candidates = 1 OR instr(normalized_name, target_norm) > 0
+        )
+        WHERE rn = 1
+    ''')
+    
+    cursor.execute('''
+        SELECT target_name, name, candidates > 1
+        FROM profile_matches
+        ORDER BY target_id
+        LIMIT 10
+    ''')
+    for name, source_name, multi in cursor:
+        print(f'  ✓ "{name}" <- "{source_name}"' + (' (multi-match)' if multi else ''))
+    
+    # Profil-Daten in einem Durchgang übernehmen
+    cursor.execute('''
+        UPDATE players
+        SET 
+            birth_date = pm.birth_date,
+            birth_place = pm.birth_place,
+            height_cm = pm.height_cm,
+            weight_kg = pm.weight_kg,
+            primary_position = pm.primary_position,
+            nationality = pm.nationality,
+            image_url = pm.image_url,
+            profile_url = pm.profile_url
+        FROM profile_matches pm
+        WHERE players.player_id = pm.target_id
+    ''')
+    enriched = cursor.rowcount
     
     conn.commit()
     
@@ -170,7 +174,7 @@ def enrich_players_smart(db_path: str, base_path: str = "fsvarchiv"):
         ORDER BY name
     ''')
     
-    for name, nat, pos, height in cursor.fetchall():
+    for name, nat, pos, height in cursor:
         status = '✓' if nat else '✗'
         print(f'  {status} {name:<20} Nat: {nat if nat else "FEHLT":<15} Pos: {pos if pos else "FEHLT":<20}')
     
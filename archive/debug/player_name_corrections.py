@@ -3,9 +3,12 @@
 Manual corrections for player name mismatches between lineups and profiles
 """
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from bs4 import BeautifulSoup
-import re
+from lxml import etree
+from _html import find_bold, read_html, stripped_strings
+from _patterns import NATIONALITY_HDR, POSITION_HDR, normalize_whitespace, scan_profile
 
 # Manual mapping: DB name -> profile filename (without .html)
 NAME_CORRECTIONS = {
@@ -13,13 +16,104 @@ NAME_CORRECTIONS = {
     # Add more as needed
 }
 
-def normalize_whitespace(value: str) -> str:
-    return re.sub(r"\s+", " ", value.strip())
+UPDATE_PROFILE_SQL = '''
+    UPDATE players
+    SET birth_date = COALESCE(?, birth_date),
+        birth_place = COALESCE(?, birth_place),
+        height_cm = COALESCE(?, height_cm),
+        weight_kg = COALESCE(?, weight_kg),
+        primary_position = COALESCE(?, primary_position),
+        nationality = COALESCE(?, nationality),
+        profile_url = COALESCE(?, profile_url)
+    WHERE player_id = ?
+'''
+
+# Erst ab so vielen Profilen lohnt sich ein Prozess-Pool
+PARALLEL_MIN_PROFILES = 64
+
+def parse_profile(path: Path):
+    """Parse the profile fields of one player HTML file
+    
+    Returns None (after reporting the error) if the file cannot be read or parsed,
+    so one bad profile does not abort the whole run.
+    """
+    try:
+        tree = read_html(path)
+    except (OSError, ValueError, etree.ParserError) as e:
+        # e.g. mmap of an empty file raises ValueError
+        print(f'  ✗ Profil-Datei nicht lesbar: {path} ({e})')
+        return None
+    
+    # Parse Profil-Daten
+    information = "\n".join(stripped_strings(tree))
+    
+    profile_matches = scan_profile(information)
+    
+    # Parse birth date
+    birth_match = profile_matches.get("birth_date")
+    birth_date = None
+    birth_place = None
+    if birth_match:
+        try:
+            birth_date = datetime.strptime(birth_match.group("birth_date"), "%d.%m.%Y").strftime("%Y-%m-%d")
+        except ValueError:
+            birth_date = birth_match.group("birth_date")
+        birth_place = birth_match.group("birth_place").strip()
+    
+    # Parse height and weight
+    height_match = profile_matches.get("height")
+    height_cm = int(height_match.group("height")) if height_match else None
+    
+    weight_match = profile_matches.get("weight")
+    weight_kg = int(weight_match.group("weight")) if weight_match else None
+    
+    # Parse position
+    primary_position = None
+    position_header = find_bold(tree, POSITION_HDR)
+    if position_header is not None:
+        parent = position_header.getparent()
+        if parent is not None:
+            found_header = False
+            for string in stripped_strings(parent):
+                if found_header and string and not string.endswith(":"):
+                    primary_position = normalize_whitespace(string)
+                    break
+                if "position" in string.lower():
+                    found_header = True
+    
+    # Parse nationality
+    nationality = None
+    nationality_header = find_bold(tree, NATIONALITY_HDR)
+    if nationality_header is not None:
+        parent = nationality_header.getparent()
+        if parent is not None:
+            found_header = False
+            for string in stripped_strings(parent):
+                if found_header and string and not string.endswith(":"):
+                    nationality = normalize_whitespace(string)
+                    break
+                if "nationalit" in string.lower():
+                    found_header = True
+    
+    return {
+        "birth_date": birth_date,
+        "birth_place": birth_place,
+        "height_cm": height_cm,
+        "weight_kg": weight_kg,
+        "primary_position": primary_position,
+        "nationality": nationality,
+    }
 
 def apply_manual_corrections(db_path: str, base_path: str = "fsvarchiv"):
     """Apply manual corrections for known name mismatches"""
     
     conn = sqlite3.connect(db_path)
+    # Alle Updates in einer expliziten Transaktion, ohne fsync pro Statement
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-200000')
+    conn.execute('BEGIN IMMEDIATE')
     cursor = conn.cursor()
     
     print('='*80)
@@ -28,6 +122,8 @@ def apply_manual_corrections(db_path: str, base_path: str = "fsvarchiv"):
     
     spieler_dir = Path(base_path) / "spieler"
     corrected = 0
+    jobs = []  # (db_name, profile_filename, players, profile_path)
+    batched_updates = []
     
     for db_name, profile_filename in NAME_CORRECTIONS.items():
         print(f'\nKorrigiere: "{db_name}" -> "{profile_filename}.html"')
@@ -52,78 +148,37 @@ def apply_manual_corrections(db_path: str, base_path: str = "fsvarchiv"):
             print(f'  ✗ Profil-Datei nicht gefunden: {profile_path}')
             continue
         
-        with profile_path.open('r', encoding='latin-1', errors='ignore') as f:
-            soup = BeautifulSoup(f.read(), 'lxml')
-        
-        # Parse Profil-Daten
-        information = soup.get_text("\n", strip=True)
-        
-        # Parse birth date
-        from datetime import datetime
-        birth_match = re.search(r"\*.*?(\d{2}\.\d{2}\.\d{4}).*?in\s+([^,\n]+)", information, re.DOTALL)
-        birth_date = None
-        birth_place = None
-        if birth_match:
-            try:
-                birth_date = datetime.strptime(birth_match.group(1), "%d.%m.%Y").strftime("%Y-%m-%d")
-            except ValueError:
-                birth_date = birth_match.group(1)
-            birth_place = birth_match.group(2).strip()
-        
-        # Parse height and weight
-        height_match = re.search(r"(\d{2,3})\s*cm", information)
-        height_cm = int(height_match.group(1)) if height_match else None
-        
-        weight_match = re.search(r"(\d{2,3})\s*kg", information)
-        weight_kg = int(weight_match.group(1)) if weight_match else None
-        
-        # Parse position
-        primary_position = None
-        position_header = soup.find("b", string=re.compile("Position", re.IGNORECASE))
-        if position_header:
-            parent = position_header.find_parent()
-            if parent:
-                found_header = False
-                for string in parent.stripped_strings:
-                    if found_header and string and not string.endswith(":"):
-                        primary_position = normalize_whitespace(string)
-                        break
-                    if "position" in string.lower():
-                        found_header = True
+        jobs.append((db_name, profile_filename, players, profile_path))
+    
+    # Wenige Profile direkt parsen, viele parallel; DB-Updates bleiben im Hauptprozess
+    paths = [job[3] for job in jobs]
+    if len(paths) < PARALLEL_MIN_PROFILES:
+        parsed = [parse_profile(path) for path in paths]
+    else:
+        with ProcessPoolExecutor() as executor:
+            parsed = list(executor.map(parse_profile, paths, chunksize=32))
+    
+    for (db_name, profile_filename, players, _), fields in zip(jobs, parsed):
+        if fields is None:
+            continue
         
-        # Parse nationality
-        nationality = None
-        nationality_header = soup.find("b", string=re.compile(r"Nationalit[aä]t", re.IGNORECASE))
-        if nationality_header:
-            parent = nationality_header.find_parent()
-            if parent:
-                found_header = False
-                for string in parent.stripped_strings:
-                    if found_header and string and not string.endswith(":"):
-                        nationality = normalize_whitespace(string)
-                        break
-                    if "nationalit" in string.lower():
-                        found_header = True
+        print(f'\nProfil "{profile_filename}.html" für "{db_name}":')
         
         # Update alle gefundenen Spieler
         for pid, name in players:
-            cursor.execute('''
-                UPDATE players
-                SET birth_date = COALESCE(?, birth_date),
-                    birth_place = COALESCE(?, birth_place),
-                    height_cm = COALESCE(?, height_cm),
-                    weight_kg = COALESCE(?, weight_kg),
-                    primary_position = COALESCE(?, primary_position),
-                    nationality = COALESCE(?, nationality),
-                    profile_url = COALESCE(?, profile_url)
-                WHERE player_id = ?
-            ''', (birth_date, birth_place, height_cm, weight_kg, primary_position, 
-                  nationality, f"spieler/{profile_filename}.html", pid))
+            batched_updates.append((
+                fields["birth_date"], fields["birth_place"], fields["height_cm"],
+                fields["weight_kg"], fields["primary_position"], fields["nationality"],
+                f"spieler/{profile_filename}.html", pid,
+            ))
             
             print(f'  ✓ Aktualisiert ID {pid}: "{name}"')
-            print(f'     Nat: {nationality}, Pos: {primary_position}, Größe: {height_cm}')
+            print(f'     Nat: {fields["nationality"]}, Pos: {fields["primary_position"]}, Größe: {fields["height_cm"]}')
             corrected += 1
     
+    # Ein vorbereitetes Statement für alle Updates
+    cursor.executemany(UPDATE_PROFILE_SQL, batched_updates)
+    
     conn.commit()
     conn.close()
     
@@ -133,4 +188,3 @@ def apply_manual_corrections(db_path: str, base_path: str = "fsvarchiv"):
 
 if __name__ == '__main__':
     apply_manual_corrections('fsv_archive_complete.db')
-
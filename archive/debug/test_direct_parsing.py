@@ -2,25 +2,14 @@
 """
 Test direct player profile parsing
 """
-import sqlite3
 from pathlib import Path
-from comprehensive_fsv_parser import ComprehensiveFSVParser
+from comprehensive_fsv_parser import normalize_name
+from _shared_parser import make_test_parser
 
-def test_direct_parsing():
+def test_direct_parsing(parser):
     """Test parsing player profile directly"""
     
-    # Create a test database
-    test_db = "test_direct_parsing.db"
-    
-    # Remove old test database if it exists
-    if Path(test_db).exists():
-        Path(test_db).unlink()
-    
-    # Create parser
-    parser = ComprehensiveFSVParser(
-        base_path="fsvarchiv",
-        db_name=test_db
-    )
+    test_db = parser.db.db_path
     
     print("Testing direct player profile parsing...")
     print("="*80)
@@ -34,7 +23,6 @@ def test_direct_parsing():
         print(f"  {name}: {path}")
     
     # Check if brosinski is in the index
-    from comprehensive_fsv_parser import normalize_name
     normalized_name = normalize_name("Brosinski")
     print(f"\nNormalized name for 'Brosinski': '{normalized_name}'")
     
@@ -52,14 +40,19 @@ def test_direct_parsing():
     parser.parse_player_profile("Brosinski", season_path)
     
     # Check the results
-    conn = sqlite3.connect(test_db)
-    cursor = conn.cursor()
+    cursor = parser.db.conn.cursor()
+    
+    # Covering index so the lookup never touches the table rows (test DB only)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_players_covering
+        ON players(normalized_name, name, height_cm, weight_kg, nationality, primary_position, birth_date, birth_place)
+    """)
     
     cursor.execute("""
         SELECT name, height_cm, weight_kg, nationality, primary_position, birth_date, birth_place
         FROM players
-        WHERE normalized_name LIKE '%brosinski%'
-    """)
+        WHERE normalized_name = ?
+    """, (normalized_name,))
     
     results = cursor.fetchall()
     
@@ -88,12 +81,10 @@ def test_direct_parsing():
         
         print("\nAll players in database:")
         cursor.execute("SELECT name, normalized_name FROM players LIMIT 20")
-        for row in cursor.fetchall():
+        for row in cursor:
             print(f"  - {row[0]} (normalized: {row[1]})")
-    
-    conn.close()
     print(f"\nTest database: {test_db}")
 
 if __name__ == "__main__":
-    test_direct_parsing()
+    test_direct_parsing(make_test_parser())
 
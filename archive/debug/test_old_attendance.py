@@ -3,33 +3,56 @@
 Test attendance parsing for old vs new match formats
 """
 from pathlib import Path
-from bs4 import BeautifulSoup
+import mmap
 import re
+import lxml.html
+from lxml import etree
 from datetime import datetime
+from _patterns import normalize_whitespace
 
-def normalize_whitespace(value: str) -> str:
-    return re.sub(r"\s+", " ", value.strip())
+# One parser for all match pages; comments, PIs and blank text are never needed
+_HTML_PARSER = lxml.html.HTMLParser(
+    encoding="iso-8859-1", remove_comments=True, remove_pis=True, remove_blank_text=True
+)
+# First text node containing "Zuschauer" (case-insensitive), found in C
+_ZUSCHAUER_XPATH = etree.XPath(
+    "(//text()[contains(translate(., 'ZUSCHAER', 'zuschaer'), 'zuschauer')])[1]"
+)
+# Byte prefilter for read_match_details, just as case-insensitive
+_ZUSCHAUER_BYTES = re.compile(rb"zuschauer", re.IGNORECASE)
+
+# Bytes around the keyword that are parsed before falling back to the full page
+_HEADER_WINDOW = 512
+
+# Tausender-Trenner in einem Durchlauf entfernen
+_STRIP_SEPS = str.maketrans("", "", ".,")
 
 def parse_int(value: str) -> int:
-    value = value.strip()
-    if not value:
-        return None
-    value = value.replace(".", "").replace(",", "")
+    value = value.strip().translate(_STRIP_SEPS)
     if value.isdigit():
         return int(value)
     return None
 
-def extract_match_details(soup: BeautifulSoup) -> dict:
-    """Extract match details using UPDATED logic"""
+def extract_match_details(tree) -> tuple:
+    """Extract match details using UPDATED logic
+    
+    Returns the details and whether the date parsed as a real date.
+    """
+    date_parsed = False
     info = {
         "date": None,
         "kickoff": None,
         "attendance": None,
     }
     
-    header_line = soup.find(string=re.compile(r"Zuschauer", re.IGNORECASE))
-    if header_line:
-        container_text = header_line.parent.get_text(" ", strip=True) if header_line.parent else header_line
+    header_lines = _ZUSCHAUER_XPATH(tree) if tree is not None else None
+    if header_lines:
+        header_line = header_lines[0]
+        # Tail text belongs to the element that contains the preceding sibling
+        container = header_line.getparent()
+        if header_line.is_tail:
+            container = container.getparent()
+        container_text = " ".join(t.strip() for t in container.itertext() if t.strip())
         text = normalize_whitespace(container_text)
         parts = [p.strip() for p in text.replace(" Uhr", "").split(",")]
         
@@ -39,25 +62,44 @@ def extract_match_details(soup: BeautifulSoup) -> dict:
             if date_parts:
                 try:
                     info["date"] = datetime.strptime(date_parts[-1], "%d.%m.%Y").strftime("%Y-%m-%d")
+                    date_parsed = True
                 except ValueError:
                     info["date"] = date_parts[-1]
         
         # Determine format: old (Datum, Zuschauer) vs new (Datum, Zeit, Zuschauer)
         # Check each part for "Zuschauer" keyword to find attendance
-        for i, part in enumerate(parts[1:], 1):
-            part_lower = part.lower()
-            if "zuschauer" in part_lower or "zuschau" in part_lower:
-                # This part contains attendance
-                attendance_text = part.replace("Zuschauer.", "").replace("Zuschauer", "").strip()
-                # Handle special cases like "keine Zuschauer"
-                if not attendance_text.startswith("keine") and not attendance_text.startswith("no"):
-                    attendance_value = parse_int(attendance_text.split()[0] if attendance_text else "")
-                    info["attendance"] = attendance_value
-            elif i == 1 and not ("zuschauer" in part_lower):
-                # First part after date, doesn't contain "Zuschauer" -> likely kickoff time
-                info["kickoff"] = part
+        lower_parts = [p.lower() for p in parts]
+        for i in range(1, len(parts)):
+            part = parts[i]
+            if "zuschau" not in lower_parts[i]:
+                if i == 1:
+                    # First part after date, doesn't contain "Zuschauer" -> likely kickoff time
+                    info["kickoff"] = part
+                continue
+            # This part contains attendance
+            attendance_text = part.replace("Zuschauer.", "").replace("Zuschauer", "").strip()
+            # Handle special cases like "keine Zuschauer"
+            if not attendance_text.startswith("keine") and not attendance_text.startswith("no"):
+                info["attendance"] = parse_int(attendance_text.split()[0] if attendance_text else "")
+                break
     
-    return info
+    return info, date_parsed
+
+def read_match_details(path: Path) -> dict:
+    """Extract match details, parsing only the bytes around "Zuschauer" if possible"""
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        match = _ZUSCHAUER_BYTES.search(data)
+        if match is None:
+            return extract_match_details(None)[0]
+        
+        idx = match.start()
+        window = data[max(0, idx - _HEADER_WINDOW):idx + _HEADER_WINDOW]
+        info, date_parsed = extract_match_details(lxml.html.document_fromstring(window, parser=_HTML_PARSER))
+        if date_parsed:
+            return info
+        
+        # Window cut the header apart (or the date is not a real date) -> parse the whole page
+        return extract_match_details(lxml.html.document_fromstring(data, parser=_HTML_PARSER))[0]
 
 def test_matches():
     """Test various match formats"""
@@ -81,10 +123,7 @@ def test_matches():
             print(f'  ✗ File not found')
             continue
         
-        with full_path.open("r", encoding="latin-1", errors="ignore") as f:
-            soup = BeautifulSoup(f.read(), "lxml")
-        
-        info = extract_match_details(soup)
+        info = read_match_details(full_path)
         
         # Check results
         if info["date"]:
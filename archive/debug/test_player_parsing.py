@@ -2,33 +2,18 @@
 """
 Test script to verify player parsing improvements
 """
-import sqlite3
-from pathlib import Path
-from comprehensive_fsv_parser import ComprehensiveFSVParser
+from _shared_parser import make_test_parser
 
-def test_player_parsing():
+def test_player_parsing(parser):
     """Test if player attributes are being parsed correctly"""
     
-    # Create a test database
-    test_db = "test_player_parsing.db"
-    
-    # Remove old test database if it exists
-    if Path(test_db).exists():
-        Path(test_db).unlink()
-    
-    # Create parser with just one season that contains Brosinski
-    parser = ComprehensiveFSVParser(
-        base_path="fsvarchiv",
-        db_name=test_db,
-        seasons=["2014-15"]  # Brosinski's first season with Mainz
-    )
+    test_db = parser.db.db_path
     
     print("Parsing season 2014-15...")
     parser.parse_season("2014-15")
     
     # Check the results
-    conn = sqlite3.connect(test_db)
-    cursor = conn.cursor()
+    cursor = parser.db.conn.cursor()
     
     # Query for Brosinski
     cursor.execute("""
@@ -66,17 +51,15 @@ def test_player_parsing():
         print("No results found for Brosinski")
         print("\nAll players in database:")
         cursor.execute("SELECT name FROM players LIMIT 10")
-        for row in cursor.fetchall():
+        for row in cursor:
             print(f"  - {row[0]}")
     
-    conn.close()
-    
     print("\n" + "="*80)
     print("TEST COMPLETED")
     print("="*80)
     print(f"\nTest database saved as: {test_db}")
-    print("You can inspect it with: sqlite3 test_player_parsing.db")
+    print(f"You can inspect it with: sqlite3 {test_db}")
 
 if __name__ == "__main__":
-    test_player_parsing()
+    test_player_parsing(make_test_parser())
 
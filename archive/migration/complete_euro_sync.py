@@ -13,25 +13,94 @@ Usage:
 """
 
 import argparse
+import io
 import os
 import sqlite3
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 import psycopg2
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Rows per round-trip when streaming the ID mappings from server-side cursors
+MAPPING_ITERSIZE = 10000
+
+# Session settings for the loader connection. Skipping the WAL flush on commit
+# is safe here: every insert uses ON CONFLICT DO NOTHING, so a lost load is
+# simply re-run. commit_delay is left out because it needs superuser rights.
+PG_LOADER_OPTIONS = "-c synchronous_commit=off -c work_mem=64MB -c maintenance_work_mem=256MB"
+
+
+def _canon_team(name: str) -> str:
+    """Fold "FSV" and "1. FSV Mainz 05" style names into one key."""
+    if name == "FSV" or "FSV Mainz" in name:
+        return "FSV Mainz"
+    return name
+
+
+def _copy_value(value) -> str:
+    """Format one value for COPY ... (FORMAT text)."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def copy_buffer(rows) -> io.StringIO:
+    """Serialize rows as a COPY ... (FORMAT text) stream."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_value(value) for value in row))
+        buf.write("\n")
+    buf.seek(0)
+    return buf
+
+
+def copy_rows(pg_cur, table: str, columns: List[str], rows: List[tuple]):
+    """Bulk load rows into public.<table> via COPY into a staging temp table.
+
+    COPY cannot skip conflicting rows, so the data lands in a temp table first
+    and is moved over with INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+    """
+    if not rows:
+        return
+    
+    staging = f"tmp_{table}"
+    column_list = ", ".join(columns)
+    
+    # Only the copied columns: LIKE would bring along the NOT NULL of the
+    # identity key without its default, and COPY leaves that column out
+    pg_cur.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DELETE ROWS AS
+        SELECT {column_list} FROM public.{table} WITH NO DATA
+    """)
+    pg_cur.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT text)", copy_buffer(rows))
+    pg_cur.execute(f"""
+        INSERT INTO public.{table} ({column_list})
+        SELECT {column_list} FROM {staging}
+        ON CONFLICT DO NOTHING
+    """)
+    pg_cur.execute(f"TRUNCATE {staging}")
+
 
 class CompleteEuroSyncer:
     """Complete sync and quality fix for Europapokal matches."""
     
-    def __init__(self, sqlite_path: str, dry_run: bool = False):
+    def __init__(self, sqlite_path: str, dry_run: bool = False, rebuild_indexes: bool = False,
+                 force: bool = False):
         self.sqlite_path = sqlite_path
         self.dry_run = dry_run
+        self.rebuild_indexes = rebuild_indexes
+        self.force = force
         self.sqlite_conn = sqlite3.connect(sqlite_path)
-        self.sqlite_conn.row_factory = sqlite3.Row
-        self.pg_conn = psycopg2.connect(os.getenv("DB_URL"))
+        self.pg_conn = psycopg2.connect(os.getenv("DB_URL"), options=PG_LOADER_OPTIONS)
+        self.pg_conn.set_session(autocommit=False)
+        # One cursor for every statement of the run
+        self.pg_cur = self.pg_conn.cursor()
         
         # ID mappings
         self.player_id_map: Dict[int, int] = {}
@@ -50,53 +119,136 @@ class CompleteEuroSyncer:
     def close(self):
         """Close connections."""
         self.sqlite_conn.close()
+        self.pg_cur.close()
         self.pg_conn.close()
     
+    def details_already_synced(self) -> bool:
+        """Check whether the Euro matches already have lineups in Postgres."""
+        self.pg_cur.execute("""
+            SELECT 1 FROM public.matches m
+            WHERE m.match_id BETWEEN 3354 AND 3359
+            AND EXISTS (SELECT 1 FROM public.match_lineups ml WHERE ml.match_id = m.match_id)
+            LIMIT 1
+        """)
+        return self.pg_cur.fetchone() is not None
+    
     def build_mappings(self):
         """Build ID mappings between SQLite and Postgres."""
         print("Building ID mappings...")
         
-        # Map players
-        with self.pg_conn.cursor() as pg_cur:
-            pg_cur.execute("SELECT player_id, name, normalized_name FROM public.players")
-            pg_players = {(row[1], row[2]): row[0] for row in pg_cur.fetchall()}
-        
-        sqlite_cur = self.sqlite_conn.execute("SELECT player_id, name, normalized_name FROM players")
-        for row in sqlite_cur.fetchall():
-            pg_id = pg_players.get((row['name'], row['normalized_name']))
-            if pg_id:
-                self.player_id_map[row['player_id']] = pg_id
+        # Ship the SQLite player/team keys to Postgres and join there,
+        # instead of pulling the full public tables into Python.
+        # SQLite is read on this thread only; the two Postgres joins run
+        # concurrently on separate connections while the next reads continue.
+        mapping_conn = psycopg2.connect(os.getenv("DB_URL"), options=PG_LOADER_OPTIONS)
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                players = self.sqlite_conn.execute(
+                    "SELECT player_id, name, normalized_name FROM players"
+                ).fetchall()
+                player_future = executor.submit(self._map_players, self.pg_conn, players)
+                
+                teams = self.sqlite_conn.execute(
+                    "SELECT team_id, name, normalized_name FROM teams"
+                ).fetchall()
+                team_future = executor.submit(self._map_teams, mapping_conn, teams)
+                
+                sqlite_euro_matches = self._read_sqlite_euro_matches()
+                
+                self.player_id_map = player_future.result()
+                self.team_id_map = team_future.result()
+        finally:
+            mapping_conn.close()
         
         print(f"  Mapped {len(self.player_id_map)} players")
-        
-        # Map teams
-        with self.pg_conn.cursor() as pg_cur:
-            pg_cur.execute("SELECT team_id, name, normalized_name FROM public.teams")
-            pg_teams_data = pg_cur.fetchall()
-            pg_teams = {(row[1], row[2]): row[0] for row in pg_teams_data}
-            pg_teams_by_norm = {row[2]: row[0] for row in pg_teams_data}
-        
-        sqlite_cur = self.sqlite_conn.execute("SELECT team_id, name, normalized_name FROM teams")
-        for row in sqlite_cur.fetchall():
-            # Exact match
-            pg_id = pg_teams.get((row['name'], row['normalized_name']))
-            if pg_id:
-                self.team_id_map[row['team_id']] = pg_id
-            # FSV special case
-            elif row['name'] == 'FSV':
-                for (pg_name, pg_norm), pg_id in pg_teams.items():
-                    if 'fsv mainz' in pg_norm.lower():
-                        self.team_id_map[row['team_id']] = pg_id
-                        break
-            # Normalized match
-            elif row['normalized_name'] in pg_teams_by_norm:
-                self.team_id_map[row['team_id']] = pg_teams_by_norm[row['normalized_name']]
-        
         print(f"  Mapped {len(self.team_id_map)} teams")
         
         # Map the 6 Euro matches we just added (by date and teams)
         print("  Mapping Euro matches...")
         
+        # Get corresponding matches from Postgres (recently added)
+        pg_cur = self.pg_cur
+        pg_cur.execute("""
+            SELECT m.match_id, m.match_date::TEXT, t_home.name as home, t_away.name as away
+            FROM public.matches m
+            JOIN public.teams t_home ON m.home_team_id = t_home.team_id
+            JOIN public.teams t_away ON m.away_team_id = t_away.team_id
+            WHERE m.match_id >= 3354 AND m.match_id <= 3359
+        """)
+        
+        for row in pg_cur.fetchall():
+            pg_match_id, date, home, away = row
+            # Try to match with SQLite (accounting for FSV name difference)
+            sqlite_id = sqlite_euro_matches.get((date, _canon_team(home), _canon_team(away)))
+            if sqlite_id is not None:
+                self.match_id_map[sqlite_id] = pg_match_id
+                print(f"    Mapped match {sqlite_id} → {pg_match_id}: {date}")
+        
+        print(f"  Mapped {len(self.match_id_map)} Euro matches")
+    
+    def _map_players(self, pg_conn, players: List[tuple]) -> Dict[int, int]:
+        """Map SQLite player IDs to Postgres player IDs by name."""
+        with pg_conn.cursor() as pg_cur:
+            pg_cur.execute("""
+                CREATE TEMP TABLE tmp_src_players (
+                    sqlite_id INTEGER, name TEXT, normalized_name TEXT
+                ) ON COMMIT DROP
+            """)
+            pg_cur.copy_expert("COPY tmp_src_players FROM STDIN WITH (FORMAT text)", copy_buffer(players))
+        with pg_conn.cursor(name='player_map_cur') as map_cur:
+            map_cur.itersize = MAPPING_ITERSIZE
+            map_cur.execute("""
+                SELECT DISTINCT ON (s.sqlite_id) s.sqlite_id, p.player_id
+                FROM tmp_src_players s
+                JOIN public.players p
+                  ON p.name = s.name AND p.normalized_name = s.normalized_name
+                ORDER BY s.sqlite_id, p.player_id DESC
+            """)
+            return dict(map_cur)
+    
+    def _map_teams(self, pg_conn, teams: List[tuple]) -> Dict[int, int]:
+        """Map SQLite team IDs: exact match, then FSV special case, then normalized match."""
+        with pg_conn.cursor() as pg_cur:
+            pg_cur.execute("""
+                CREATE TEMP TABLE tmp_src_teams (
+                    sqlite_id INTEGER, name TEXT, normalized_name TEXT
+                ) ON COMMIT DROP
+            """)
+            pg_cur.copy_expert("COPY tmp_src_teams FROM STDIN WITH (FORMAT text)", copy_buffer(teams))
+        with pg_conn.cursor(name='team_map_cur') as map_cur:
+            map_cur.itersize = MAPPING_ITERSIZE
+            map_cur.execute("""
+                SELECT sqlite_id, team_id
+                FROM (
+                    SELECT
+                        s.sqlite_id,
+                        COALESCE(
+                            exact.team_id,
+                            CASE WHEN s.name = 'FSV' THEN fsv.team_id ELSE norm.team_id END
+                        ) AS team_id
+                    FROM tmp_src_teams s
+                    LEFT JOIN LATERAL (
+                        SELECT t.team_id FROM public.teams t
+                        WHERE t.name = s.name AND t.normalized_name = s.normalized_name
+                        ORDER BY t.team_id DESC LIMIT 1
+                    ) exact ON TRUE
+                    LEFT JOIN LATERAL (
+                        SELECT t.team_id FROM public.teams t
+                        WHERE s.name = 'FSV' AND lower(t.normalized_name) LIKE '%fsv mainz%'
+                        ORDER BY t.team_id LIMIT 1
+                    ) fsv ON TRUE
+                    LEFT JOIN LATERAL (
+                        SELECT t.team_id FROM public.teams t
+                        WHERE t.normalized_name = s.normalized_name
+                        ORDER BY t.team_id DESC LIMIT 1
+                    ) norm ON TRUE
+                ) mapped
+                WHERE team_id IS NOT NULL
+            """)
+            return dict(map_cur)
+    
+    def _read_sqlite_euro_matches(self) -> Dict[tuple, int]:
+        """Index the SQLite Euro matches by (date, home, away)."""
         # Get Euro matches from SQLite
         sqlite_cur = self.sqlite_conn.execute("""
             SELECT m.match_id, m.match_date, t_home.name as home, t_away.name as away
@@ -112,344 +264,347 @@ class CompleteEuroSyncer:
                  OR t_home.name LIKE '%Anderlecht%' OR t_away.name LIKE '%Anderlecht%')
         """)
         
-        sqlite_euro_matches = {
-            f"{row['match_date']}|{row['home']}|{row['away']}": row['match_id']
-            for row in sqlite_cur.fetchall()
-        }
-        
-        # Get corresponding matches from Postgres (recently added)
-        with self.pg_conn.cursor() as pg_cur:
-            pg_cur.execute("""
-                SELECT m.match_id, m.match_date::TEXT, t_home.name as home, t_away.name as away
-                FROM public.matches m
-                JOIN public.teams t_home ON m.home_team_id = t_home.team_id
-                JOIN public.teams t_away ON m.away_team_id = t_away.team_id
-                WHERE m.match_id >= 3354 AND m.match_id <= 3359
-            """)
-            
-            for row in pg_cur.fetchall():
-                pg_match_id, date, home, away = row
-                # Try to match with SQLite (accounting for FSV name difference)
-                for key, sqlite_id in sqlite_euro_matches.items():
-                    key_date, key_home, key_away = key.split('|')
-                    if key_date == date:
-                        # Check if teams match (accounting for FSV vs "1. FSV Mainz 05")
-                        home_match = (home == key_home or 
-                                    (home == "FSV" and "FSV Mainz" in key_home) or
-                                    (key_home == "FSV" and "FSV Mainz" in home))
-                        away_match = (away == key_away or
-                                    (away == "FSV" and "FSV Mainz" in key_away) or
-                                    (key_away == "FSV" and "FSV Mainz" in away))
-                        
-                        if home_match and away_match:
-                            self.match_id_map[sqlite_id] = pg_match_id
-                            print(f"    Mapped match {sqlite_id} → {pg_match_id}: {date}")
-                            break
-        
-        print(f"  Mapped {len(self.match_id_map)} Euro matches")
+        # Index by (date, home, away) with FSV name variants folded together
+        sqlite_euro_matches = {}
+        for match_id, match_date, home, away in sqlite_cur:
+            sqlite_euro_matches[(match_date, _canon_team(home), _canon_team(away))] = match_id
+        return sqlite_euro_matches
     
     def sync_match_details(self):
         """Sync lineups, goals, cards, and substitutions for Euro matches."""
         print(f"\nSyncing match details for {len(self.match_id_map)} Euro matches...")
         
-        for sqlite_match_id, pg_match_id in self.match_id_map.items():
-            print(f"\n  Match {pg_match_id} (SQLite ID: {sqlite_match_id}):")
-            
-            # Sync lineups
-            self._sync_lineups(sqlite_match_id, pg_match_id)
-            
-            # Sync goals
-            self._sync_goals(sqlite_match_id, pg_match_id)
-            
-            # Sync cards
-            self._sync_cards(sqlite_match_id, pg_match_id)
-            
-            # Sync substitutions
-            self._sync_substitutions(sqlite_match_id, pg_match_id)
+        # Secondary indexes are dropped for the load and rebuilt afterwards;
+        # both happen inside the sync transaction, so a failure restores them
+        index_defs = []
+        if self.rebuild_indexes and not self.dry_run:
+            index_defs = self._drop_secondary_indexes()
+        
+        # One query per table for all matches instead of one per match
+        self._sync_lineups()
+        self._sync_goals()
+        self._sync_cards()
+        self._sync_substitutions()
+        
+        if index_defs:
+            print(f"  Rebuilding {len(index_defs)} secondary indexes...")
+            for index_def in index_defs:
+                self.pg_cur.execute(index_def)
     
-    def _sync_lineups(self, sqlite_match_id: int, pg_match_id: int):
-        """Sync match lineups."""
-        sqlite_cur = self.sqlite_conn.execute("""
-            SELECT * FROM match_lineups WHERE match_id = ?
-        """, (sqlite_match_id,))
+    def _drop_secondary_indexes(self) -> List[str]:
+        """Drop non-unique indexes on the detail tables and return their DDL."""
+        pg_cur = self.pg_cur
+        # Unique/primary indexes stay: ON CONFLICT DO NOTHING relies on them
+        pg_cur.execute("""
+            SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i
+            JOIN pg_class t ON t.oid = i.indrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            WHERE n.nspname = 'public'
+            AND t.relname IN ('match_lineups', 'goals', 'cards', 'match_substitutions')
+            AND NOT i.indisunique
+            AND NOT i.indisprimary
+        """)
+        indexes = pg_cur.fetchall()
+        
+        for index_name, _ in indexes:
+            pg_cur.execute(f"DROP INDEX {index_name}")
         
-        lineups = sqlite_cur.fetchall()
+        print(f"  Dropped {len(indexes)} secondary indexes for the load")
+        return [index_def for _, index_def in indexes]
+    
+    def _fetch_match_rows(self, table: str, columns: List[str]) -> List[tuple]:
+        """Fetch the given columns of a match detail table for all mapped matches."""
+        match_ids = list(self.match_id_map)
+        if not match_ids:
+            return []
+        
+        placeholders = ','.join('?' * len(match_ids))
+        sqlite_cur = self.sqlite_conn.execute(
+            f"SELECT {', '.join(columns)} FROM {table} WHERE match_id IN ({placeholders})", match_ids
+        )
+        return sqlite_cur.fetchall()
+    
+    def _sync_lineups(self):
+        """Sync match lineups."""
+        lineups = self._fetch_match_rows('match_lineups', [
+            'match_id', 'team_id', 'player_id', 'shirt_number', 'is_starter',
+            'minute_on', 'stoppage_on', 'minute_off', 'stoppage_off'
+        ])
         
         if self.dry_run:
-            print(f"    [DRY RUN] Would sync {len(lineups)} lineups")
+            print(f"  [DRY RUN] Would sync {len(lineups)} lineups")
             return
         
-        with self.pg_conn.cursor() as pg_cur:
-            for lineup in lineups:
-                pg_player_id = self.player_id_map.get(lineup['player_id'])
-                pg_team_id = self.team_id_map.get(lineup['team_id'])
-                
-                if not pg_player_id or not pg_team_id:
-                    continue
-                
-                pg_cur.execute("""
-                    INSERT INTO public.match_lineups (
-                        match_id, team_id, player_id, shirt_number, is_starter,
-                        minute_on, stoppage_on, minute_off, stoppage_off
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT DO NOTHING
-                """, (
-                    pg_match_id, pg_team_id, pg_player_id,
-                    lineup['shirt_number'],
-                    bool(lineup['is_starter']) if lineup['is_starter'] is not None else None,
-                    lineup['minute_on'], lineup['stoppage_on'],
-                    lineup['minute_off'], lineup['stoppage_off']
-                ))
-        
-        self.pg_conn.commit()
+        # Bind the lookups once; each row is unpacked positionally into locals
+        match_ids, team_ids, player_ids = self.match_id_map, self.team_id_map.get, self.player_id_map.get
+        rows = []
+        for (match_id, team_id, player_id, shirt_number, is_starter,
+             minute_on, stoppage_on, minute_off, stoppage_off) in lineups:
+            pg_player_id = player_ids(player_id)
+            pg_team_id = team_ids(team_id)
+            
+            if not pg_player_id or not pg_team_id:
+                continue
+            
+            rows.append((
+                match_ids[match_id], pg_team_id, pg_player_id,
+                shirt_number,
+                bool(is_starter) if is_starter is not None else None,
+                minute_on, stoppage_on,
+                minute_off, stoppage_off
+            ))
+        
+        pg_cur = self.pg_cur
+        copy_rows(pg_cur, 'match_lineups', [
+            'match_id', 'team_id', 'player_id', 'shirt_number',
+            'is_starter', 'minute_on', 'stoppage_on', 'minute_off',
+            'stoppage_off'
+        ], rows)
+        
         self.stats['lineups_synced'] += len(lineups)
-        print(f"    ✓ Synced {len(lineups)} lineups")
+        print(f"  ✓ Synced {len(lineups)} lineups")
     
-    def _sync_goals(self, sqlite_match_id: int, pg_match_id: int):
+    def _sync_goals(self):
         """Sync goals."""
-        sqlite_cur = self.sqlite_conn.execute("""
-            SELECT * FROM goals WHERE match_id = ?
-        """, (sqlite_match_id,))
-        
-        goals = sqlite_cur.fetchall()
+        goals = self._fetch_match_rows('goals', [
+            'match_id', 'team_id', 'player_id', 'assist_player_id',
+            'minute', 'stoppage', 'score_home', 'score_away', 'event_type'
+        ])
         
         if self.dry_run:
-            print(f"    [DRY RUN] Would sync {len(goals)} goals")
+            print(f"  [DRY RUN] Would sync {len(goals)} goals")
             return
         
-        with self.pg_conn.cursor() as pg_cur:
-            for goal in goals:
-                pg_player_id = self.player_id_map.get(goal['player_id'])
-                pg_team_id = self.team_id_map.get(goal['team_id'])
-                pg_assist_id = self.player_id_map.get(goal['assist_player_id']) if goal['assist_player_id'] else None
-                
-                if not pg_player_id or not pg_team_id:
-                    continue
-                
-                pg_cur.execute("""
-                    INSERT INTO public.goals (
-                        match_id, team_id, player_id, assist_player_id,
-                        minute, stoppage, score_home, score_away, event_type
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT DO NOTHING
-                """, (
-                    pg_match_id, pg_team_id, pg_player_id, pg_assist_id,
-                    goal['minute'], goal['stoppage'],
-                    goal['score_home'], goal['score_away'], goal['event_type']
-                ))
-        
-        self.pg_conn.commit()
+        match_ids, team_ids, player_ids = self.match_id_map, self.team_id_map.get, self.player_id_map.get
+        rows = []
+        for (match_id, team_id, player_id, assist_player_id,
+             minute, stoppage, score_home, score_away, event_type) in goals:
+            pg_player_id = player_ids(player_id)
+            pg_team_id = team_ids(team_id)
+            pg_assist_id = player_ids(assist_player_id) if assist_player_id else None
+            
+            if not pg_player_id or not pg_team_id:
+                continue
+            
+            rows.append((
+                match_ids[match_id], pg_team_id, pg_player_id, pg_assist_id,
+                minute, stoppage,
+                score_home, score_away, event_type
+            ))
+        
+        pg_cur = self.pg_cur
+        copy_rows(pg_cur, 'goals', [
+            'match_id', 'team_id', 'player_id', 'assist_player_id',
+            'minute', 'stoppage', 'score_home', 'score_away', 'event_type'
+        ], rows)
+        
         self.stats['goals_synced'] += len(goals)
-        print(f"    ✓ Synced {len(goals)} goals")
+        print(f"  ✓ Synced {len(goals)} goals")
     
-    def _sync_cards(self, sqlite_match_id: int, pg_match_id: int):
+    def _sync_cards(self):
         """Sync cards."""
-        sqlite_cur = self.sqlite_conn.execute("""
-            SELECT * FROM cards WHERE match_id = ?
-        """, (sqlite_match_id,))
-        
-        cards = sqlite_cur.fetchall()
+        cards = self._fetch_match_rows('cards', [
+            'match_id', 'team_id', 'player_id', 'minute', 'stoppage', 'card_type'
+        ])
         
         if self.dry_run:
-            print(f"    [DRY RUN] Would sync {len(cards)} cards")
+            print(f"  [DRY RUN] Would sync {len(cards)} cards")
             return
         
-        with self.pg_conn.cursor() as pg_cur:
-            for card in cards:
-                pg_player_id = self.player_id_map.get(card['player_id'])
-                pg_team_id = self.team_id_map.get(card['team_id'])
-                
-                if not pg_player_id or not pg_team_id:
-                    continue
-                
-                pg_cur.execute("""
-                    INSERT INTO public.cards (
-                        match_id, team_id, player_id, minute, stoppage, card_type
-                    ) VALUES (%s, %s, %s, %s, %s, %s)
-                    ON CONFLICT DO NOTHING
-                """, (
-                    pg_match_id, pg_team_id, pg_player_id,
-                    card['minute'], card['stoppage'], card['card_type']
-                ))
-        
-        self.pg_conn.commit()
+        match_ids, team_ids, player_ids = self.match_id_map, self.team_id_map.get, self.player_id_map.get
+        rows = []
+        for match_id, team_id, player_id, minute, stoppage, card_type in cards:
+            pg_player_id = player_ids(player_id)
+            pg_team_id = team_ids(team_id)
+            
+            if not pg_player_id or not pg_team_id:
+                continue
+            
+            rows.append((
+                match_ids[match_id], pg_team_id, pg_player_id,
+                minute, stoppage, card_type
+            ))
+        
+        pg_cur = self.pg_cur
+        copy_rows(pg_cur, 'cards', [
+            'match_id', 'team_id', 'player_id', 'minute', 'stoppage',
+            'card_type'
+        ], rows)
+        
         self.stats['cards_synced'] += len(cards)
-        print(f"    ✓ Synced {len(cards)} cards")
+        print(f"  ✓ Synced {len(cards)} cards")
     
-    def _sync_substitutions(self, sqlite_match_id: int, pg_match_id: int):
+    def _sync_substitutions(self):
         """Sync substitutions."""
-        sqlite_cur = self.sqlite_conn.execute("""
-            SELECT * FROM match_substitutions WHERE match_id = ?
-        """, (sqlite_match_id,))
-        
-        subs = sqlite_cur.fetchall()
+        subs = self._fetch_match_rows('match_substitutions', [
+            'match_id', 'team_id', 'minute', 'stoppage', 'player_on_id', 'player_off_id'
+        ])
         
         if self.dry_run:
-            print(f"    [DRY RUN] Would sync {len(subs)} substitutions")
+            print(f"  [DRY RUN] Would sync {len(subs)} substitutions")
             return
         
-        with self.pg_conn.cursor() as pg_cur:
-            for sub in subs:
-                pg_player_on = self.player_id_map.get(sub['player_on_id'])
-                pg_player_off = self.player_id_map.get(sub['player_off_id'])
-                pg_team_id = self.team_id_map.get(sub['team_id'])
-                
-                if not pg_player_on or not pg_player_off or not pg_team_id:
-                    continue
-                
-                pg_cur.execute("""
-                    INSERT INTO public.match_substitutions (
-                        match_id, team_id, minute, stoppage, player_on_id, player_off_id
-                    ) VALUES (%s, %s, %s, %s, %s, %s)
-                    ON CONFLICT DO NOTHING
-                """, (
-                    pg_match_id, pg_team_id,
-                    sub['minute'], sub['stoppage'],
-                    pg_player_on, pg_player_off
-                ))
-        
-        self.pg_conn.commit()
+        match_ids, team_ids, player_ids = self.match_id_map, self.team_id_map.get, self.player_id_map.get
+        rows = []
+        for match_id, team_id, minute, stoppage, player_on_id, player_off_id in subs:
+            pg_player_on = player_ids(player_on_id)
+            pg_player_off = player_ids(player_off_id)
+            pg_team_id = team_ids(team_id)
+            
+            if not pg_player_on or not pg_player_off or not pg_team_id:
+                continue
+            
+            rows.append((
+                match_ids[match_id], pg_team_id,
+                minute, stoppage,
+                pg_player_on, pg_player_off
+            ))
+        
+        pg_cur = self.pg_cur
+        copy_rows(pg_cur, 'match_substitutions', [
+            'match_id', 'team_id', 'minute', 'stoppage', 'player_on_id',
+            'player_off_id'
+        ], rows)
+        
         self.stats['subs_synced'] += len(subs)
-        print(f"    ✓ Synced {len(subs)} substitutions")
+        print(f"  ✓ Synced {len(subs)} substitutions")
     
     def fix_competition_classification(self):
         """Fix Bundesliga matches incorrectly classified as Europapokal."""
         print("\nFixing competition classification...")
         
-        # Get Bundesliga and Europapokal competition IDs
-        with self.pg_conn.cursor() as pg_cur:
-            pg_cur.execute("SELECT competition_id, name FROM public.competitions WHERE name IN ('Bundesliga', 'Europapokal')")
-            comps = {row[1]: row[0] for row in pg_cur.fetchall()}
-            
-            bundesliga_id = comps.get('Bundesliga')
-            europapokal_id = comps.get('Europapokal')
-            
-            if not bundesliga_id or not europapokal_id:
-                print("  Error: Could not find competition IDs")
-                return
-            
-            # Find 2016-17 season
-            pg_cur.execute("SELECT season_id FROM public.seasons WHERE label = '2016-17'")
-            season_result = pg_cur.fetchone()
-            if not season_result:
-                print("  Error: Could not find 2016-17 season")
-                return
-            
-            season_id = season_result[0]
-            
-            # Get Bundesliga season_competition (should already exist)
-            pg_cur.execute("""
-                SELECT season_competition_id FROM public.season_competitions
-                WHERE season_id = %s AND competition_id = %s
-            """, (season_id, bundesliga_id))
-            
-            result = pg_cur.fetchone()
-            if not result:
-                print("  Error: Could not find Bundesliga season_competition for 2016-17")
-                print("  This should exist. Please check the database.")
-                return
-            
-            bundesliga_sc_id = result[0]
-            
-            # Get Europapokal season_competition
-            pg_cur.execute("""
-                SELECT season_competition_id FROM public.season_competitions
-                WHERE season_id = %s AND competition_id = %s
-            """, (season_id, europapokal_id))
-            
-            euro_result = pg_cur.fetchone()
-            if not euro_result:
-                print("  Error: Could not find Europapokal season_competition")
-                return
-            euro_sc_id = euro_result[0]
-            
-            # Find Bundesliga matches incorrectly classified as Europapokal
-            # (those with round_name like "N. Spieltag")
+        pg_cur = self.pg_cur
+        # Competition, season and season_competition IDs in one round-trip;
+        # the LEFT JOINs keep a row so missing pieces show up as NULL
+        pg_cur.execute("""
+            WITH comps AS (
+                SELECT competition_id, name FROM public.competitions
+                WHERE name IN ('Bundesliga', 'Europapokal')
+            ),
+            season AS (
+                SELECT season_id FROM public.seasons WHERE label = '2016-17'
+            )
+            SELECT b.competition_id, e.competition_id, s.season_id,
+                   bsc.season_competition_id, esc.season_competition_id
+            FROM (SELECT 1) AS one
+            LEFT JOIN comps b ON b.name = 'Bundesliga'
+            LEFT JOIN comps e ON e.name = 'Europapokal'
+            LEFT JOIN season s ON TRUE
+            LEFT JOIN public.season_competitions bsc
+                ON bsc.season_id = s.season_id AND bsc.competition_id = b.competition_id
+            LEFT JOIN public.season_competitions esc
+                ON esc.season_id = s.season_id AND esc.competition_id = e.competition_id
+        """)
+        bundesliga_id, europapokal_id, season_id, bundesliga_sc_id, euro_sc_id = pg_cur.fetchone()
+        
+        if not bundesliga_id or not europapokal_id:
+            print("  Error: Could not find competition IDs")
+            return
+        
+        if not season_id:
+            print("  Error: Could not find 2016-17 season")
+            return
+        
+        # Bundesliga season_competition should already exist
+        if not bundesliga_sc_id:
+            print("  Error: Could not find Bundesliga season_competition for 2016-17")
+            print("  This should exist. Please check the database.")
+            return
+        
+        if not euro_sc_id:
+            print("  Error: Could not find Europapokal season_competition")
+            return
+        
+        # Find Bundesliga matches incorrectly classified as Europapokal
+        # (those with round_name like "N. Spieltag")
+        if self.dry_run:
             pg_cur.execute("""
-                SELECT match_id, round_name, match_date, home_team_id, away_team_id
+                SELECT match_id, round_name, match_date
                 FROM public.matches
                 WHERE season_competition_id = %s
-                AND round_name LIKE '%Spieltag%'
+                AND round_name LIKE '%%Spieltag%%'
             """, (euro_sc_id,))
             
             bundesliga_matches = pg_cur.fetchall()
             
             print(f"  Found {len(bundesliga_matches)} Bundesliga matches misclassified as Europapokal")
-            
-            if self.dry_run:
-                print(f"  [DRY RUN] Would reclassify {len(bundesliga_matches)} matches to Bundesliga")
-                for match in bundesliga_matches[:5]:
-                    print(f"    - Match {match[0]}: {match[1]} ({match[2]})")
-                if len(bundesliga_matches) > 5:
-                    print(f"    ... and {len(bundesliga_matches) - 5} more")
-                return
-            
-            # Update matches to correct season_competition
-            pg_cur.execute("""
-                UPDATE public.matches
-                SET season_competition_id = %s
-                WHERE season_competition_id = %s
-                AND round_name LIKE '%Spieltag%'
-            """, (bundesliga_sc_id, euro_sc_id))
-            
-            self.pg_conn.commit()
-            self.stats['competitions_fixed'] = len(bundesliga_matches)
-            print(f"  ✓ Reclassified {len(bundesliga_matches)} matches to Bundesliga")
+            print(f"  [DRY RUN] Would reclassify {len(bundesliga_matches)} matches to Bundesliga")
+            for match in bundesliga_matches[:5]:
+                print(f"    - Match {match[0]}: {match[1]} ({match[2]})")
+            if len(bundesliga_matches) > 5:
+                print(f"    ... and {len(bundesliga_matches) - 5} more")
+            return
+        
+        # Update matches to correct season_competition, counting them in the same statement
+        pg_cur.execute("""
+            UPDATE public.matches
+            SET season_competition_id = %s
+            WHERE season_competition_id = %s
+            AND round_name LIKE '%%Spieltag%%'
+            RETURNING match_id
+        """, (bundesliga_sc_id, euro_sc_id))
+        
+        reclassified = pg_cur.rowcount
+        
+        print(f"  Found {reclassified} Bundesliga matches misclassified as Europapokal")
+        self.stats['competitions_fixed'] = reclassified
+        print(f"  ✓ Reclassified {reclassified} matches to Bundesliga")
     
     def validate_data_quality(self):
         """Run quality checks on the synced data."""
         print("\nData Quality Validation:")
         print("=" * 80)
         
-        with self.pg_conn.cursor() as pg_cur:
-            # Check Europapokal matches
-            pg_cur.execute("""
-                SELECT COUNT(*) FROM public.matches m
-                JOIN public.season_competitions sc ON m.season_competition_id = sc.season_competition_id
-                JOIN public.competitions c ON sc.competition_id = c.competition_id
-                WHERE c.name = 'Europapokal'
-            """)
-            euro_count = pg_cur.fetchone()[0]
-            print(f"✓ Total Europapokal matches: {euro_count}")
-            
-            # Check match details for Euro matches
-            pg_cur.execute("""
-                SELECT 
-                    COUNT(DISTINCT m.match_id) as matches,
-                    COUNT(DISTINCT g.goal_id) as goals,
-                    COUNT(DISTINCT ml.lineup_id) as lineups,
-                    COUNT(DISTINCT c.card_id) as cards,
-                    COUNT(DISTINCT ms.substitution_id) as subs
-                FROM public.matches m
-                JOIN public.season_competitions sc ON m.season_competition_id = sc.season_competition_id
-                JOIN public.competitions comp ON sc.competition_id = comp.competition_id
-                LEFT JOIN public.goals g ON m.match_id = g.match_id
-                LEFT JOIN public.match_lineups ml ON m.match_id = ml.match_id
-                LEFT JOIN public.cards c ON m.match_id = c.match_id
-                LEFT JOIN public.match_substitutions ms ON m.match_id = ms.match_id
-                WHERE comp.name = 'Europapokal'
-                AND m.match_id >= 3354 AND m.match_id <= 3359
-            """)
-            
-            result = pg_cur.fetchone()
-            print(f"\n6 Recently Synced Euro Matches:")
-            print(f"  - Matches: {result[0]}")
-            print(f"  - Goals: {result[1]}")
-            print(f"  - Lineups: {result[2]}")
-            print(f"  - Cards: {result[3]}")
-            print(f"  - Substitutions: {result[4]}")
-            
-            # Check 2016-17 Bundesliga matches
-            pg_cur.execute("""
-                SELECT COUNT(*) FROM public.matches m
-                JOIN public.season_competitions sc ON m.season_competition_id = sc.season_competition_id
-                JOIN public.competitions c ON sc.competition_id = c.competition_id
-                JOIN public.seasons s ON sc.season_id = s.season_id
-                WHERE c.name = 'Bundesliga' AND s.label = '2016-17'
-            """)
-            
-            bundesliga_count = pg_cur.fetchone()[0]
-            print(f"\n✓ 2016-17 Bundesliga matches: {bundesliga_count}")
+        pg_cur = self.pg_cur
+        # Check Europapokal matches
+        pg_cur.execute("""
+            SELECT COUNT(*) FROM public.matches m
+            JOIN public.season_competitions sc ON m.season_competition_id = sc.season_competition_id
+            JOIN public.competitions c ON sc.competition_id = c.competition_id
+            WHERE c.name = 'Europapokal'
+        """)
+        euro_count = pg_cur.fetchone()[0]
+        print(f"✓ Total Europapokal matches: {euro_count}")
+        
+        # Check match details for Euro matches
+        pg_cur.execute("""
+            SELECT 
+                COUNT(DISTINCT m.match_id) as matches,
+                COUNT(DISTINCT g.goal_id) as goals,
+                COUNT(DISTINCT ml.lineup_id) as lineups,
+                COUNT(DISTINCT c.card_id) as cards,
+                COUNT(DISTINCT ms.substitution_id) as subs
+            FROM public.matches m
+            JOIN public.season_competitions sc ON m.season_competition_id = sc.season_competition_id
+            JOIN public.competitions comp ON sc.competition_id = comp.competition_id
+            LEFT JOIN public.goals g ON m.match_id = g.match_id
+            LEFT JOIN public.match_lineups ml ON m.match_id = ml.match_id
+            LEFT JOIN public.cards c ON m.match_id = c.match_id
+            LEFT JOIN public.match_substitutions ms ON m.match_id = ms.match_id
+            WHERE comp.name = 'Europapokal'
+            AND m.match_id >= 3354 AND m.match_id <= 3359
+        """)
+        
+        result = pg_cur.fetchone()
+        print(f"\n6 Recently Synced Euro Matches:")
+        print(f"  - Matches: {result[0]}")
+        print(f"  - Goals: {result[1]}")
+        print(f"  - Lineups: {result[2]}")
+        print(f"  - Cards: {result[3]}")
+        print(f"  - Substitutions: {result[4]}")
+        
+        # Check 2016-17 Bundesliga matches
+        pg_cur.execute("""
+            SELECT COUNT(*) FROM public.matches m
+            JOIN public.season_competitions sc ON m.season_competition_id = sc.season_competition_id
+            JOIN public.competitions c ON sc.competition_id = c.competition_id
+            JOIN public.seasons s ON sc.season_id = s.season_id
+            WHERE c.name = 'Bundesliga' AND s.label = '2016-17'
+        """)
+        
+        bundesliga_count = pg_cur.fetchone()[0]
+        print(f"\n✓ 2016-17 Bundesliga matches: {bundesliga_count}")
     
     def run(self):
         """Run complete sync and quality fix process."""
@@ -462,14 +617,28 @@ class CompleteEuroSyncer:
             print("MODE: LIVE")
         print()
         
-        # Step 1: Build mappings
-        self.build_mappings()
-        
-        # Step 2: Sync match details
-        self.sync_match_details()
+        # Re-runs skip the mapping scans and the detail sync unless forced
+        sync_details = self.force or not self.details_already_synced()
+        if not sync_details:
+            print("Match details already synced, skipping steps 1 and 2 (use --force to re-run)")
         
-        # Step 3: Fix competition classification
-        self.fix_competition_classification()
+        # Step 1: Build mappings
+        if sync_details:
+            self.build_mappings()
+        
+        # Steps 2 and 3 run in one transaction with a single commit
+        try:
+            # Step 2: Sync match details
+            if sync_details:
+                self.sync_match_details()
+            
+            # Step 3: Fix competition classification
+            self.fix_competition_classification()
+            
+            self.pg_conn.commit()
+        except Exception:
+            self.pg_conn.rollback()
+            raise
         
         # Step 4: Validate
         if not self.dry_run:
@@ -494,10 +663,15 @@ def main():
     parser = argparse.ArgumentParser(description="Complete Europapokal sync with quality fixes")
     parser.add_argument("--sqlite", default="fsv_archive_complete.db", help="SQLite database path")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be done")
+    parser.add_argument("--rebuild-indexes", action="store_true",
+                        help="Drop secondary indexes on the detail tables during the load and rebuild them afterwards")
+    parser.add_argument("--force", action="store_true",
+                        help="Sync match details even if the Euro matches already have lineups")
     args = parser.parse_args()
     
     try:
-        syncer = CompleteEuroSyncer(args.sqlite, dry_run=args.dry_run)
+        syncer = CompleteEuroSyncer(args.sqlite, dry_run=args.dry_run, rebuild_indexes=args.rebuild_indexes,
+                                    force=args.force)
         syncer.run()
         syncer.close()
     except Exception as e:
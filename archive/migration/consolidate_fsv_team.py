@@ -3,14 +3,16 @@
 Consolidate duplicate FSV Mainz team entries.
 
 Problem: Database has TWO team entries for FSV Mainz:
-  - Team ID 1: "1. FSV Mainz 05"
-  - Team ID 36: "FSV"
+  - "1. FSV Mainz 05" (Team ID 1 in production)
+  - "FSV" (Team ID 36 in production)
 
 This causes duplicate matches. This script:
-1. Merges all "FSV" (ID 36) references to "1. FSV Mainz 05" (ID 1)
+1. Merges all "FSV" references to "1. FSV Mainz 05"
 2. Deletes duplicate matches
 3. Updates all foreign key references
 
+The team IDs are looked up by name at the start of the run.
+
 Usage:
     python consolidate_fsv_team.py --dry-run
     python consolidate_fsv_team.py
@@ -19,222 +21,472 @@ Usage:
 import argparse
 import os
 import sys
+from typing import List, Optional, Tuple
 import psycopg2
+from psycopg2 import sql
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Session advisory lock key (hashed server-side) that serializes runs of this script
+ADVISORY_LOCK_NAME = "fsv_consolidation"
+
+# Team names of the entry that is kept and the duplicate merged into it
+KEEP_TEAM_NAME = "1. FSV Mainz 05"
+DROP_TEAM_NAME = "FSV"
+
+# Partial indexes on the duplicate team's references, only for the duration of the run
+MIGRATION_INDEXES = [
+    ("matches", "home_team_id"),
+    ("matches", "away_team_id"),
+    ("match_lineups", "team_id"),
+    ("match_coaches", "team_id"),
+    ("goals", "team_id"),
+    ("cards", "team_id"),
+    ("match_substitutions", "team_id"),
+    ("seasons", "team_id"),
+]
+
+
+def team_remap_values(remaps: List[Tuple[int, int]]) -> sql.Composed:
+    """(old team_id, new team_id) pairs as a VALUES list aliased v(old_id, new_id).
+    
+    Used with UPDATE ... FROM, so further consolidations only add rows here
+    instead of extra UPDATEs per table.
+    """
+    rows = sql.SQL(", ").join(
+        sql.SQL("({}::integer, {}::integer)").format(sql.Literal(old_id), sql.Literal(new_id))
+        for old_id, new_id in remaps
+    )
+    return sql.SQL("(VALUES {rows}) AS v(old_id, new_id)").format(rows=rows)
+
+
+# Child tables whose team references are merged: (table, column, description)
+TEAM_REFERENCES = [
+    ("match_lineups", "team_id", "lineups"),
+    ("match_coaches", "team_id", "coach assignments"),
+    ("goals", "team_id", "goals"),
+    ("cards", "team_id", "cards"),
+    ("match_substitutions", "team_id", "substitutions"),
+    ("seasons", "team_id", "season assignments"),
+]
+
+# 2016-17 Bundesliga (season_competition, date, home, away) keys that occur more
+# than once after the team ID merge, with the lowest match_id as the one to keep.
+# %(sc_ids)s are the season_competition_ids from find_season_competition_ids()
+DUPLICATE_MATCHES_CTE = """
+    WITH dup_keys AS (
+        SELECT season_competition_id, match_date, home_team_id, away_team_id,
+               MIN(match_id) AS keep_id
+        FROM public.matches
+        WHERE season_competition_id = ANY(%(sc_ids)s)
+        GROUP BY season_competition_id, match_date, home_team_id, away_team_id
+        HAVING COUNT(*) > 1
+    )
+"""
+
+# Per-match child tables cleared in bulk before the duplicate matches themselves,
+# so the ON DELETE CASCADE triggers on matches find nothing left to delete
+MATCH_CHILD_TABLES = ["match_lineups", "goals", "cards", "match_substitutions", "match_coaches"]
+
+# Matches m that are duplicates of a dup_keys row d
+DUPLICATE_MATCH_CONDITION = """
+    m.season_competition_id = d.season_competition_id
+    AND m.match_date = d.match_date
+    AND m.home_team_id = d.home_team_id
+    AND m.away_team_id = d.away_team_id
+    AND m.match_id <> d.keep_id
+"""
+
+
+def find_team_ids(pg_conn) -> Optional[Tuple[int, int]]:
+    """Resolve (keep_id, drop_id) from the team names.
+    
+    Returns None if the duplicate team no longer exists (already consolidated).
+    """
+    with pg_conn.cursor() as cur:
+        cur.execute(
+            "SELECT name, team_id FROM public.teams WHERE name IN (%s, %s) ORDER BY team_id",
+            (KEEP_TEAM_NAME, DROP_TEAM_NAME),
+        )
+        rows = cur.fetchall()
+    
+    team_ids = {}
+    for name, team_id in rows:
+        team_ids.setdefault(name, []).append(team_id)
+    
+    ambiguous = [f"{name} {ids}" for name, ids in team_ids.items() if len(ids) > 1]
+    if ambiguous:
+        raise ValueError(f"Team name(s) match more than one team: {', '.join(ambiguous)}")
+    if KEEP_TEAM_NAME not in team_ids:
+        raise ValueError(f"Team(s) not found: {KEEP_TEAM_NAME}")
+    if DROP_TEAM_NAME not in team_ids:
+        print(f"Team '{DROP_TEAM_NAME}' not found - nothing to consolidate")
+        return None
+    
+    (keep_id,), (drop_id,) = team_ids[KEEP_TEAM_NAME], team_ids[DROP_TEAM_NAME] = team_ids[KEEP_TEAM_NAME], team_ids[DROP_TEAM_NAME]
+    print(f"Keeping Team {keep_id} '{KEEP_TEAM_NAME}', merging Team {drop_id} '{DROP_TEAM_NAME}'\n")
+    return keep_id, drop_id
+
+
+def find_season_competition_ids(pg_conn):
+    """Resolve the 2016-17 Bundesliga season_competition_ids once per run."""
+    with pg_conn.cursor() as cur:
+        cur.execute("""
+            SELECT sc.season_competition_id
+            FROM public.season_competitions sc
+            JOIN public.competitions c ON sc.competition_id = c.competition_id
+            JOIN public.seasons s ON sc.season_id = s.season_id
+            WHERE c.name = 'Bundesliga' AND s.label = '2016-17'
+        """)
+        return [row[0] for row in cur.fetchall()]
+
+
+def create_migration_indexes(pg_conn, drop_id):
+    """Create partial indexes so the duplicate team lookups avoid full table scans."""
+    print("Creating temporary migration indexes...")
+    
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    pg_conn.autocommit = True
+    try:
+        with pg_conn.cursor() as cur:
+            # A failed concurrent build leaves an INVALID index behind, which
+            # IF NOT EXISTS below would silently reuse - drop those first
+            cur.execute("""
+                SELECT i.relname
+                FROM pg_index x
+                JOIN pg_class i ON i.oid = x.indexrelid
+                JOIN pg_namespace n ON n.oid = i.relnamespace
+                WHERE n.nspname = 'public'
+                  AND i.relname = ANY(%s)
+                  AND NOT x.indisvalid
+            """, ([f"ix_mig_{table}_{column}" for table, column in MIGRATION_INDEXES],))
+            for (index,) in cur.fetchall():
+                print(f"  Dropping invalid index {index} left by an earlier run")
+                cur.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {index}").format(
+                    index=sql.Identifier("public", index)
+                ))
+            
+            for table, column in MIGRATION_INDEXES:
+                cur.execute(sql.SQL("""
+                    CREATE INDEX CONCURRENTLY IF NOT EXISTS {index}
+                    ON {table} ({column}) WHERE {column} = {drop_id}
+                """).format(
+                    index=sql.Identifier(f"ix_mig_{table}_{column}"),
+                    table=sql.Identifier("public", table),
+                    column=sql.Identifier(column),
+                    drop_id=sql.Literal(drop_id),
+                ))
+    finally:
+        pg_conn.autocommit = False
+
 
-def analyze_duplication(pg_conn):
+def drop_migration_indexes(pg_conn):
+    """Drop the partial indexes created by create_migration_indexes."""
+    pg_conn.rollback()
+    pg_conn.autocommit = True
+    try:
+        with pg_conn.cursor() as cur:
+            for table, column in MIGRATION_INDEXES:
+                cur.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {index}").format(
+                    index=sql.Identifier("public", f"ix_mig_{table}_{column}")
+                ))
+    finally:
+        pg_conn.autocommit = False
+    print("\nDropped temporary migration indexes")
+
+
+def analyze_duplication(pg_conn, keep_id, drop_id):
     """Analyze the extent of duplication."""
     print("Analyzing duplication...")
     
+    teams = [(keep_id, KEEP_TEAM_NAME), (drop_id, DROP_TEAM_NAME)]
+    
+    # Every public table with a team_id column except teams itself, so new
+    # child tables are picked up without editing this list
     with pg_conn.cursor() as cur:
-        # Check matches using each team ID
-        for team_id, team_name in [(1, "1. FSV Mainz 05"), (36, "FSV")]:
-            cur.execute("""
-                SELECT COUNT(*) 
-                FROM public.matches m
-                WHERE m.home_team_id = %s OR m.away_team_id = %s
-            """, (team_id, team_id))
-            count = cur.fetchone()[0]
-            print(f"  Team {team_id} '{team_name}': {count} matches")
-        
-        # Check other tables
-        tables_to_check = [
-            ("match_lineups", "team_id"),
-            ("match_coaches", "team_id"),
-            ("goals", "team_id"),
-            ("cards", "team_id"),
-            ("match_substitutions", "team_id"),
-        ]
-        
-        print(f"\n  Other references to Team ID 36 ('FSV'):")
-        for table, column in tables_to_check:
-            cur.execute(f"SELECT COUNT(*) FROM public.{table} WHERE {column} = 36")
-            count = cur.fetchone()[0]
-            if count > 0:
-                print(f"    {table}: {count} records")
-
-
-def merge_team_ids(pg_conn, dry_run=False):
-    """Merge Team ID 36 into Team ID 1."""
-    print(f"\n{'[DRY RUN] ' if dry_run else ''}Merging FSV team IDs...")
-    
-    tables_to_update = [
-        # Format: (table, column, description)
-        ("match_lineups", "team_id", "lineups"),
-        ("match_coaches", "team_id", "coach assignments"),
-        ("goals", "team_id", "goals"),
-        ("cards", "team_id", "cards"),
-        ("match_substitutions", "team_id", "substitutions"),
-        ("seasons", "team_id", "season assignments"),
+        cur.execute("""
+            SELECT c.table_name, c.column_name
+            FROM information_schema.columns c
+            JOIN information_schema.tables t
+              ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+            WHERE c.table_schema = 'public'
+            AND c.column_name = 'team_id'
+            AND c.table_name <> 'teams'
+            AND t.table_type = 'BASE TABLE'
+            ORDER BY c.table_name
+        """)
+        tables_to_check = cur.fetchall()
+    
+    # All counts in one statement, one row per (kind, label)
+    counts = [
+        sql.SQL("""SELECT 'matches' AS kind, {label} AS label, COUNT(*)
+            FROM public.matches m
+            WHERE m.home_team_id = {team_id} OR m.away_team_id = {team_id}""").format(
+            label=sql.Literal(str(team_id)), team_id=sql.Literal(team_id)
+        )
+        for team_id, _ in teams
+    ] + [
+        sql.SQL("SELECT 'table', {label}, COUNT(*) FROM {table} WHERE {column} = {drop_id}").format(
+            label=sql.Literal(table), table=sql.Identifier("public", table),
+            column=sql.Identifier(column), drop_id=sql.Literal(drop_id),
+        )
+        for table, column in tables_to_check
     ]
     
-    total_updated = 0
+    with pg_conn.cursor() as cur:
+        cur.execute(sql.SQL("\nUNION ALL\n").join(counts))
+        rows = cur.fetchall()
+    
+    # Check matches using each team ID
+    team_names = {str(team_id): team_name for team_id, team_name in teams}
+    for kind, label, count in rows:
+        if kind == 'matches':
+            print(f"  Team {label} '{team_names[label]}': {count} matches")
+    
+    # Check other tables
+    print(f"\n  Other references to Team ID {drop_id} ('{DROP_TEAM_NAME}'):")
+    for kind, table, count in rows:
+        if kind == 'table' and count > 0:
+            print(f"    {table}: {count} records")
+
+
+def preview_merge_team_ids(pg_conn, keep_id, drop_id):
+    """Dry run of the team ID merge; the live merge runs in consolidate_team."""
+    print("\n[DRY RUN] Merging FSV team IDs...")
     
+    tables_to_update = TEAM_REFERENCES
+    ids = {'keep_id': sql.Literal(keep_id), 'drop_id': sql.Literal(drop_id)}
+    
+    # Home/away counts read the pre-update snapshot of the statement
+    match_counts = [
+        sql.SQL("SELECT 'home', COUNT(*) FROM public.matches WHERE home_team_id = {drop_id}").format(**ids),
+        sql.SQL("SELECT 'away', COUNT(*) FROM public.matches WHERE away_team_id = {drop_id}").format(**ids),
+    ]
+    
+    # All updates as data-modifying CTEs of one statement; matches gets a
+    # single UPDATE so no row is touched twice
+    remaps = team_remap_values([(drop_id, keep_id)])
+    updates = [
+        sql.SQL("""{cte} AS (
+            UPDATE {table} t SET {column} = v.new_id FROM {remaps}
+            WHERE t.{column} = v.old_id RETURNING 1
+        )""").format(
+            cte=sql.Identifier(f"u_{table}"), table=sql.Identifier("public", table),
+            column=sql.Identifier(column), remaps=remaps,
+        )
+        for table, column, _ in tables_to_update
+    ] + [sql.SQL("""u_matches AS (
+            UPDATE public.matches SET
+                home_team_id = CASE WHEN home_team_id = {drop_id} THEN {keep_id} ELSE home_team_id END,
+                away_team_id = CASE WHEN away_team_id = {drop_id} THEN {keep_id} ELSE away_team_id END
+            WHERE home_team_id = {drop_id} OR away_team_id = {drop_id}
+        )""").format(**ids)]
+    query = sql.SQL("WITH {updates}\n{counts}").format(
+        updates=sql.SQL(",\n").join(updates),
+        counts=sql.SQL("\nUNION ALL\n").join([
+            sql.SQL("SELECT {label}, COUNT(*) FROM {cte}").format(
+                label=sql.Literal(table), cte=sql.Identifier(f"u_{table}")
+            )
+            for table, _, _ in tables_to_update
+        ] + match_counts),
+    )
+    
+    # Execute the real updates and roll them back, so the reported counts
+    # come from the actual statements
     with pg_conn.cursor() as cur:
-        for table, column, desc in tables_to_update:
-            if dry_run:
-                cur.execute(f"SELECT COUNT(*) FROM public.{table} WHERE {column} = 36")
-                count = cur.fetchone()[0]
-                if count > 0:
-                    print(f"  [DRY RUN] Would update {count} {desc} in {table}")
-                    total_updated += count
-            else:
-                cur.execute(f"""
-                    UPDATE public.{table}
-                    SET {column} = 1
-                    WHERE {column} = 36
-                """)
-                count = cur.rowcount
-                if count > 0:
-                    print(f"  ✓ Updated {count} {desc} in {table}")
-                    total_updated += count
-        
-        # Update matches (both home and away)
-        if dry_run:
-            cur.execute("SELECT COUNT(*) FROM public.matches WHERE home_team_id = 36")
-            home_count = cur.fetchone()[0]
-            cur.execute("SELECT COUNT(*) FROM public.matches WHERE away_team_id = 36")
-            away_count = cur.fetchone()[0]
-            print(f"  [DRY RUN] Would update {home_count} home matches")
-            print(f"  [DRY RUN] Would update {away_count} away matches")
-            total_updated += home_count + away_count
-        else:
-            cur.execute("UPDATE public.matches SET home_team_id = 1 WHERE home_team_id = 36")
-            home_count = cur.rowcount
-            cur.execute("UPDATE public.matches SET away_team_id = 1 WHERE away_team_id = 36")
-            away_count = cur.rowcount
-            print(f"  ✓ Updated {home_count} home matches")
-            print(f"  ✓ Updated {away_count} away matches")
-            total_updated += home_count + away_count
-    
-    if not dry_run:
-        pg_conn.commit()
+        cur.execute("SAVEPOINT merge_team_ids")
+        cur.execute(query)
+        counts = dict(cur.fetchall())
+        cur.execute("ROLLBACK TO SAVEPOINT merge_team_ids")
+    
+    total_updated = 0
+    for table, _, desc in tables_to_update:
+        count = counts[table]
+        if count > 0:
+            print(f"  [DRY RUN] Would update {count} {desc} in {table}")
+            total_updated += count
+    
+    # Update matches (both home and away)
+    home_count, away_count = counts['home'], counts['away']
+    print(f"  [DRY RUN] Would update {home_count} home matches")
+    print(f"  [DRY RUN] Would update {away_count} away matches")
+    total_updated += home_count + away_count
     
     print(f"\n  Total references updated: {total_updated}")
 
 
-def remove_duplicate_matches(pg_conn, dry_run=False):
-    """After merging team IDs, remove the resulting duplicate matches."""
-    print(f"\n{'[DRY RUN] ' if dry_run else ''}Removing duplicate matches...")
+def preview_duplicate_matches(pg_conn, sc_ids):
+    """Dry run of the duplicate match removal; the live delete runs in consolidate_team."""
+    print("\n[DRY RUN] Removing duplicate matches...")
     
     with pg_conn.cursor() as cur:
-        # Find duplicates (now that both use Team ID 1)
-        cur.execute("""
-            WITH duplicates AS (
-                SELECT 
-                    m.match_id,
-                    m.match_date,
-                    m.home_team_id,
-                    m.away_team_id,
-                    m.home_score,
-                    m.away_score,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY m.season_competition_id, m.match_date, m.home_team_id, m.away_team_id
-                        ORDER BY m.match_id
-                    ) as rn
-                FROM public.matches m
-                JOIN public.season_competitions sc ON m.season_competition_id = sc.season_competition_id
-                JOIN public.competitions c ON sc.competition_id = c.competition_id
-                JOIN public.seasons s ON sc.season_id = s.season_id
-                WHERE c.name = 'Bundesliga' AND s.label = '2016-17'
-            )
-            SELECT match_id FROM duplicates WHERE rn > 1
-        """)
-        
+        cur.execute(DUPLICATE_MATCHES_CTE + f"""
+            SELECT m.match_id
+            FROM public.matches m
+            JOIN dup_keys d ON {DUPLICATE_MATCH_CONDITION}
+            ORDER BY m.match_id
+        """, {'sc_ids': sc_ids})
         duplicate_ids = [row[0] for row in cur.fetchall()]
-        
-        if not duplicate_ids:
-            print("  No duplicates found after team ID merge")
-            return
-        
-        print(f"  Found {len(duplicate_ids)} duplicate matches to delete")
-        
-        if dry_run:
-            print(f"  [DRY RUN] Would delete match IDs: {duplicate_ids}")
-            return
-        
-        # Delete duplicates (will CASCADE to related tables)
-        placeholders = ','.join(['%s'] * len(duplicate_ids))
-        cur.execute(f"""
-            DELETE FROM public.matches
-            WHERE match_id IN ({placeholders})
-        """, duplicate_ids)
-        
-        deleted_count = cur.rowcount
-        print(f"  ✓ Deleted {deleted_count} duplicate matches")
-        
-        pg_conn.commit()
+    
+    if not duplicate_ids:
+        print("  No duplicates found after team ID merge")
+        return
+    
+    print(f"  Found {len(duplicate_ids)} duplicate matches to delete")
+    print(f"  [DRY RUN] Would delete match IDs: {duplicate_ids}")
 
 
-def delete_unused_team(pg_conn, dry_run=False):
-    """Delete the unused FSV team entry (ID 36)."""
-    print(f"\n{'[DRY RUN] ' if dry_run else ''}Deleting unused team entry...")
+def preview_delete_unused_team(pg_conn, drop_id):
+    """Dry run of the team delete; the live delete runs in consolidate_team."""
+    print("\n[DRY RUN] Deleting unused team entry...")
     
     with pg_conn.cursor() as cur:
-        # Verify it's not referenced anymore
+        # Verify it's not referenced anymore (stops at the first match found)
         cur.execute("""
-            SELECT COUNT(*) FROM public.matches 
-            WHERE home_team_id = 36 OR away_team_id = 36
-        """)
-        match_count = cur.fetchone()[0]
-        
-        if match_count > 0:
-            print(f"  ⚠️  Cannot delete - still referenced in {match_count} matches")
-            return
+            SELECT EXISTS (
+                SELECT 1 FROM public.matches
+                WHERE home_team_id = %(drop_id)s OR away_team_id = %(drop_id)s
+            )
+        """, {'drop_id': drop_id})
         
-        if dry_run:
-            print("  [DRY RUN] Would delete Team ID 36 'FSV'")
+        if cur.fetchone()[0]:
+            print("  ⚠️  Cannot delete - still referenced in matches")
             return
-        
-        cur.execute("DELETE FROM public.teams WHERE team_id = 36")
-        print(f"  ✓ Deleted team ID 36 'FSV'")
-        pg_conn.commit()
+    
+    print(f"  [DRY RUN] Would delete Team ID {drop_id} '{DROP_TEAM_NAME}'")
+
 
+def build_consolidation_block(duplicates_cte: str, keep_id, drop_id) -> sql.Composed:
+    """Build the PL/pgSQL block that merges, deduplicates and deletes in one go.
+    
+    duplicates_cte is DUPLICATE_MATCHES_CTE with its parameters already bound,
+    since a DO block cannot take parameters.
+    """
+    remaps = team_remap_values([(drop_id, keep_id)])
+    child_deletes = sql.SQL("").join(
+        sql.SQL("            DELETE FROM {table} WHERE match_id = ANY(dup_ids);\n").format(
+            table=sql.Identifier("public", table)
+        )
+        for table in MATCH_CHILD_TABLES
+    )
+    updates = sql.SQL("").join(sql.SQL("""
+            UPDATE {table} t SET {column} = v.new_id FROM {remaps} WHERE t.{column} = v.old_id;
+            GET DIAGNOSTICS n = ROW_COUNT;
+            IF n > 0 THEN RAISE NOTICE {message}, n; END IF;
+            total := total + n;
+""").format(
+        table=sql.Identifier("public", table),
+        column=sql.Identifier(column),
+        message=sql.Literal(f"✓ Updated % {desc} in {table}"),
+        remaps=remaps,
+    ) for table, column, desc in TEAM_REFERENCES)
+    
+    return sql.SQL("""
+        DO $$
+        DECLARE
+            n integer;
+            total integer := 0;
+            dup_ids integer[];
+        BEGIN
+            -- 1. Merge all references of the duplicate team into the kept one
+{updates}
+            UPDATE public.matches SET home_team_id = {keep_id} WHERE home_team_id = {drop_id};
+            GET DIAGNOSTICS n = ROW_COUNT;
+            RAISE NOTICE '✓ Updated % home matches', n;
+            total := total + n;
+            
+            UPDATE public.matches SET away_team_id = {keep_id} WHERE away_team_id = {drop_id};
+            GET DIAGNOSTICS n = ROW_COUNT;
+            RAISE NOTICE '✓ Updated % away matches', n;
+            total := total + n;
+            RAISE NOTICE 'Total references updated: %', total;
+            
+            -- 2. Delete the duplicate matches the merge produced, child rows first
+            {duplicates_cte}
+            SELECT COALESCE(array_agg(m.match_id), '{{}}') INTO dup_ids
+            FROM public.matches m
+            JOIN dup_keys d ON {condition};
+{child_deletes}
+            DELETE FROM public.matches WHERE match_id = ANY(dup_ids);
+            GET DIAGNOSTICS n = ROW_COUNT;
+            RAISE NOTICE '✓ Deleted % duplicate matches', n;
+            
+            -- 3. Delete the now unused team row
+            IF EXISTS (SELECT 1 FROM public.matches WHERE home_team_id = {drop_id} OR away_team_id = {drop_id}) THEN
+                RAISE NOTICE {still_referenced};
+            ELSE
+                DELETE FROM public.teams WHERE team_id = {drop_id};
+                RAISE NOTICE {deleted};
+            END IF;
+        END $$;
+    """).format(
+        updates=updates,
+        child_deletes=child_deletes,
+        keep_id=sql.Literal(keep_id),
+        drop_id=sql.Literal(drop_id),
+        duplicates_cte=sql.SQL(duplicates_cte),
+        condition=sql.SQL(DUPLICATE_MATCH_CONDITION),
+        still_referenced=sql.Literal(f"⚠️  Cannot delete Team ID {drop_id} - still referenced in matches"),
+        deleted=sql.Literal(f"✓ Deleted team ID {drop_id} '{DROP_TEAM_NAME}'"),
+    )
 
-def verify_consolidation(pg_conn):
+
+def consolidate_team(pg_conn, sc_ids, keep_id, drop_id):
+    """Merge the duplicate team and remove the duplicate matches in one server-side block."""
+    print("\nConsolidating FSV team in one server-side block...")
+    
+    del pg_conn.notices[:]
+    try:
+        with pg_conn.cursor() as cur:
+            duplicates_cte = cur.mogrify(DUPLICATE_MATCHES_CTE, {'sc_ids': sc_ids}).decode()
+            cur.execute(build_consolidation_block(duplicates_cte, keep_id, drop_id))
+    finally:
+        # Replay the block's progress messages ("NOTICE:  ...")
+        for notice in pg_conn.notices:
+            print(f"  {notice.split(':', 1)[-1].strip()}")
+
+
+def verify_consolidation(pg_conn, drop_id):
     """Verify the consolidation was successful."""
     print("\nVerifying consolidation...")
     
+    # All three checks in one round-trip
     with pg_conn.cursor() as cur:
-        # Check 2016-17 Bundesliga count
         cur.execute("""
-            SELECT COUNT(*)
-            FROM public.matches m
-            JOIN public.season_competitions sc ON m.season_competition_id = sc.season_competition_id
-            JOIN public.competitions c ON sc.competition_id = c.competition_id
-            JOIN public.seasons s ON sc.season_id = s.season_id
-            WHERE c.name = 'Bundesliga' AND s.label = '2016-17'
-        """)
-        count = cur.fetchone()[0]
-        
-        print(f"  2016-17 Bundesliga matches: {count}")
-        if count == 34:
-            print("  ✅ PERFECT - exactly 34 matches!")
-        else:
-            print(f"  ⚠️  Expected 34, got {count}")
-        
-        # Check if Team ID 36 still exists
-        cur.execute("SELECT COUNT(*) FROM public.teams WHERE team_id = 36")
-        team_exists = cur.fetchone()[0]
-        
-        if team_exists:
-            print("  ⚠️  Team ID 36 'FSV' still exists")
-        else:
-            print("  ✓ Team ID 36 removed")
-        
-        # Check total Mainz matches
-        cur.execute("""
-            SELECT COUNT(*)
-            FROM public.matches m
-            JOIN public.teams t_home ON m.home_team_id = t_home.team_id
-            JOIN public.teams t_away ON m.away_team_id = t_away.team_id
-            WHERE t_home.name LIKE '%Mainz%' OR t_away.name LIKE '%Mainz%'
-        """)
-        total = cur.fetchone()[0]
-        print(f"  Total FSV Mainz matches across all seasons: {total:,}")
+            SELECT
+                (SELECT COUNT(*)
+                 FROM public.matches m
+                 JOIN public.season_competitions sc ON m.season_competition_id = sc.season_competition_id
+                 JOIN public.competitions c ON sc.competition_id = c.competition_id
+                 JOIN public.seasons s ON sc.season_id = s.season_id
+                 WHERE c.name = 'Bundesliga' AND s.label = '2016-17'),
+                EXISTS (SELECT 1 FROM public.teams WHERE team_id = %(drop_id)s),
+                (SELECT COUNT(*)
+                 FROM public.matches m
+                 WHERE m.home_team_id = ANY(mainz.ids) OR m.away_team_id = ANY(mainz.ids))
+            FROM (
+                -- Mainz team IDs, resolved once instead of joining teams per match
+                SELECT ARRAY(SELECT team_id FROM public.teams WHERE name LIKE '%%Mainz%%') AS ids
+            ) mainz
+        """, {'drop_id': drop_id})
+        count, team_exists, total = cur.fetchone()
+    
+    # Check 2016-17 Bundesliga count
+    print(f"  2016-17 Bundesliga matches: {count}")
+    if count == 34:
+        print("  ✅ PERFECT - exactly 34 matches!")
+    else:
+        print(f"  ⚠️  Expected 34, got {count}")
+    
+    # Check if the duplicate team still exists
+    if team_exists:
+        print(f"  ⚠️  Team ID {drop_id} '{DROP_TEAM_NAME}' still exists")
+    else:
+        print(f"  ✓ Team ID {drop_id} removed")
+    
+    # Check total Mainz matches
+    print(f"  Total FSV Mainz matches across all seasons: {total:,}")
 
 
 def main():
@@ -252,14 +504,67 @@ def main():
     
     try:
         pg_conn = psycopg2.connect(os.getenv("DB_URL"))
+        # All changes form one transaction, committed once after verification
+        pg_conn.autocommit = False
         
-        analyze_duplication(pg_conn)
-        merge_team_ids(pg_conn, dry_run=args.dry_run)
-        remove_duplicate_matches(pg_conn, dry_run=args.dry_run)
-        delete_unused_team(pg_conn, dry_run=args.dry_run)
+        # Only one consolidation at a time; the lock is held for the session
+        with pg_conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (ADVISORY_LOCK_NAME,))
+            locked = cur.fetchone()[0]
+        pg_conn.commit()
+        if not locked:
+            print("Another consolidation run is in progress - exiting")
+            pg_conn.close()
+            return
         
-        if not args.dry_run:
-            verify_consolidation(pg_conn)
+        team_ids = find_team_ids(pg_conn)
+        pg_conn.rollback()
+        if team_ids is None:
+            with pg_conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (ADVISORY_LOCK_NAME,))
+            pg_conn.commit()
+            pg_conn.close()
+            return
+        keep_id, drop_id = team_ids
+        
+        try:
+            if not args.dry_run:
+                # Inside the try, so indexes already built are dropped again
+                # if a later CREATE INDEX fails
+                create_migration_indexes(pg_conn, drop_id)
+                
+                # Session settings for this transaction only. A crash before the
+                # final commit rolls everything back, so an async WAL flush is safe
+                # (sent as one multi-statement string: one round-trip)
+                with pg_conn.cursor() as cur:
+                    cur.execute("""
+                        SET LOCAL synchronous_commit = off;
+                        SET LOCAL statement_timeout = 0;
+                        SET LOCAL lock_timeout = '30s';
+                    """)
+            
+            analyze_duplication(pg_conn, keep_id, drop_id)
+            sc_ids = find_season_competition_ids(pg_conn)
+            
+            if args.dry_run:
+                preview_merge_team_ids(pg_conn, keep_id, drop_id)
+                preview_duplicate_matches(pg_conn, sc_ids)
+                preview_delete_unused_team(pg_conn, drop_id)
+            else:
+                consolidate_team(pg_conn, sc_ids, keep_id, drop_id)
+                verify_consolidation(pg_conn, drop_id)
+                pg_conn.commit()
+        except Exception:
+            pg_conn.rollback()
+            raise
+        finally:
+            if not args.dry_run:
+                drop_migration_indexes(pg_conn)
+            # Discard any uncommitted (dry-run) work before unlocking
+            pg_conn.rollback()
+            with pg_conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (ADVISORY_LOCK_NAME,))
+            pg_conn.commit()
         
         pg_conn.close()
         
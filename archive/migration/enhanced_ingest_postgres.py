@@ -14,45 +14,378 @@ IMPROVEMENTS OVER ORIGINAL:
 """
 
 import argparse
+import fnmatch
+import io
 import logging
 import os
 import re
+import sys
 import unicodedata
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict, Any
 from datetime import datetime, date
 import json
 
+import lxml.html
 import psycopg2
 from bs4 import BeautifulSoup
+from lxml import etree
+from psycopg2.extras import execute_values
 
 from config import Config
 from precompute_embeddings import ensure_vector_extension, upsert_embeddings
 from langchain_openai import OpenAIEmbeddings
 
 
+# One parser object and precompiled XPath expressions shared by all match files
+_HTML_PARSER = lxml.html.HTMLParser()
+_TEXT_XPATH = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]")
+_PLAYER_LINKS = etree.XPath(
+    ".//a[re:test(@href, '../spieler/')]",
+    namespaces={"re": "http://exslt.org/regular-expressions"},
+)
+_PLAYER_TABLES = etree.XPath(
+    ".//table[.//a[re:test(@href, '../spieler/')]]",
+    namespaces={"re": "http://exslt.org/regular-expressions"},
+)
+_PARENT_TD = etree.XPath("ancestor::td[1]")
+_IN_BOLD = etree.XPath("boolean(ancestor::b)")
+# Attribute values and text nodes of a lineup cell: the strings its HTML is made
+# of, without serializing it. Card icons show up as img src names
+_CELL_STRINGS = etree.XPath("descendant-or-self::*/@* | descendant::text()")
+_NEXT_TABLE = etree.XPath("(descendant::table | following::table)[1]")
+_FOLLOWING_TABLE = etree.XPath("following::table[1]")
+
+
+def read_html(path: Path) -> lxml.html.HtmlElement:
+    with path.open('r', encoding='utf-8', errors='ignore') as f:
+        return lxml.html.document_fromstring(f.read(), parser=_HTML_PARSER)
+
+
+def stripped_text(element) -> str:
+    """lxml equivalent of BeautifulSoup's ``get_text(strip=True)``"""
+    return "".join(text.strip() for text in _TEXT_XPATH(element))
+
+
+def element_string(element) -> Optional[str]:
+    """lxml equivalent of BeautifulSoup's ``Tag.string``"""
+    while True:
+        children = list(element)
+        if not children:
+            return element.text
+        if len(children) > 1 or element.text or children[0].tail:
+            return None
+        element = children[0]
+
+
+# Position implied by the n-th table with player links on a match page
+_ROW_POSITIONS = {1: 'GK', 2: 'DEF', 3: 'MID', 4: 'ATT'}
+# Lineup cell values for a player link outside any table cell
+_NO_CELL = (None, None, False, False, 0, False, None)
+
+
+def parse_lineup_cell(td) -> tuple:
+    """Jersey, substitution minute, card flags and minutes played from one lineup cell."""
+    parent_text = td.text_content()
+    cell_markup = ' '.join(_CELL_STRINGS(td))
+    markup_lower = cell_markup.lower()
+    
+    # Enhanced card detection
+    yellow_count = cell_markup.count('gelbekarte') + parent_text.count('🟨')
+    red_card = ('rotekarte' in markup_lower) or ('🟥' in parent_text)
+    yellow_card = yellow_count > 0
+    second_yellow = ('gelb-rot' in markup_lower) or ('gelbrot' in markup_lower)
+    
+    # Jersey number
+    jersey_number = None
+    mnum = _CELL_JERSEY_RE.search(parent_text)
+    if mnum:
+        jersey_number = int(mnum.group(2))
+    
+    # Substitution minute (if substituted out); the regex only runs when the
+    # case-folded text contains 'aus' or 'off' ('raus' contains 'aus')
+    substituted_minute = None
+    text_folded = parent_text.casefold()
+    sub_match = None
+    if 'aus' in text_folded or 'off' in text_folded:
+        sub_match = _SUB_OUT_RE.search(parent_text)
+    if sub_match:
+        substituted_minute = int(sub_match.group(1))
+        minutes_played = substituted_minute
+    else:
+        minutes_played = 90  # Full match if not substituted
+    
+    return (jersey_number, substituted_minute, yellow_card, red_card,
+            yellow_count, second_yellow, minutes_played)
+
+
+def find_next_table(node):
+    """lxml equivalent of BeautifulSoup's ``find_next('table')`` for an element or text node"""
+    if isinstance(node, str):
+        parent = node.getparent()
+        found = _FOLLOWING_TABLE(parent) if node.is_tail else _NEXT_TABLE(parent)
+    else:
+        found = _NEXT_TABLE(node)
+    return found[0] if found else None
+
+
+# Patterns used by the parsers, compiled once
+_WS_RE = re.compile(r"\s+")
+_LEADING_JERSEY_RE = re.compile(r"^\s*\d+[\)\.]?\s+")
+_TRAILING_NUMBER_RE = re.compile(r"\s+\d+$")
+_NAME_SEPARATORS_RE = re.compile(r"[,;]+")
+_NON_NAME_CHARS_RE = re.compile(r"[^A-Za-z\-\'\s]")
+_DATE_PATTERNS = [
+    # DD.MM.YYYY format
+    (re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})"), "%d.%m.%Y"),
+    # DD.MM.YY format
+    (re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{2})"), "%d.%m.%y"),
+    # YYYY-MM-DD format
+    (re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})"), "%Y-%m-%d"),
+]
+_KICKOFF_PATTERNS = [
+    re.compile(r"(\w{2})\.\s*(\d{1,2})\.(\d{1,2})\.(\d{4}),?\s*(\d{1,2})[:.](\d{2})"),
+    re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4}),?\s*(\d{1,2})[:.](\d{2})"),
+]
+_ATTENDANCE_PATTERNS = [
+    re.compile(r"(\d{1,3}(?:\.\d{3})+)\s*Zuschauer"),
+    re.compile(r"(\d{3,6})\s*Zuschauer"),
+]
+_WEATHER_KEYWORDS = ['Regen', 'Schnee', 'Sonne', 'bewölkt', 'Nebel', '°C', 'Grad']
+_WEATHER_KEYWORD_RE = re.compile("|".join(map(re.escape, _WEATHER_KEYWORDS)))
+_WEATHER_CONTEXT = [
+    (keyword, re.compile(rf".{{0,20}}{re.escape(keyword)}.{{0,20}}"))
+    for keyword in _WEATHER_KEYWORDS
+]
+_TEMPERATURE_RE = re.compile(r"(-?\d+)\s*°C")
+_CELL_JERSEY_RE = re.compile(r'^(\s*)(\d+)')
+_SUB_OUT_RE = re.compile(r'(\d+)\..*(?:aus|raus|off)', re.IGNORECASE)
+_RESERVE_RE = re.compile(r'Reserve:', re.IGNORECASE)
+_JERSEY_RE = re.compile(r'^(\d+)')
+_GOALS_HEADER_RE = re.compile(r'Tore', re.IGNORECASE)
+_MINUTE_RE = re.compile(r'\d+\.')
+_GOAL_PATTERNS = [
+    re.compile(r"(\d+)\.\s*(\d+:\d+)\s*([^\(]+)(?:\s*\(([^\)]+)\))?"),
+    re.compile(r"(\d+)\.\s*(\d+:\d+)\s*([^,]+)(?:,\s*([^,]+))?"),
+]
+_SUBSTITUTION_PATTERNS = [
+    re.compile(r"(\d+)\.\s+([^f]+)\s+für\s+([^\n]+)"),
+    re.compile(r"(\d+)\.\s*([^,]+),?\s*(?:für|for)\s+([^,\n]+)"),
+]
+_YELLOW_CARD_RE = re.compile(r"(\d+)\.\s*([^,]+).*gelb", re.IGNORECASE)
+_SCORE_RE = re.compile(r"(\d+):(\d+)")
+_SEASON_DIR_RE = re.compile(r"\d{4}-\d{2}")
+_MATCH_LINK_RE = re.compile(r'profiliga\d+\.html')
+_OPPONENT_LINK_RE = re.compile(r'../gegner/')
+
+# Every combining mark, dropped with str.translate after NFKD decomposition
+_COMBINING_MARKS = dict.fromkeys(
+    cp for cp in range(sys.maxunicode + 1) if unicodedata.combining(chr(cp))
+)
+
+# Buffered child rows are flushed once a table has this many waiting
+INSERT_BATCH_SIZE = 1000
+
+# Manifest in the archive directory recording the size and mtime of every
+# match file as of its last ingest; unchanged files are skipped on reruns
+MANIFEST_NAME = ".ingest_manifest.json"
+
+# Columns and per-column merge rules for each buffered child table. The rules
+# say how a row combines with an existing row that has the same key, both when
+# rows are folded in memory and when the staging table is merged: 'key'
+# columns identify the row, 'keep' columns are not updated, 'new' takes the
+# incoming value, 'coalesce' prefers it unless it is NULL, 'greatest' and 'or'
+# combine both. Match_Events has no key, so its rows are always appended.
+CHILD_UPSERTS = {
+    'Match_Lineups': (
+        ('match_id', 'player_id', 'is_starter', 'is_captain', 'jersey_number',
+         'position_played', 'substituted_minute', 'yellow_card', 'red_card',
+         'yellow_card_count', 'second_yellow', 'position_row', 'position_col',
+         'minutes_played'),
+        ('key', 'key', 'new', 'new', 'coalesce', 'coalesce', 'coalesce', 'new', 'new',
+         'greatest', 'or', 'keep', 'keep', 'coalesce'),
+    ),
+    'Reserve_Players': (
+        ('match_id', 'player_id', 'jersey_number'),
+        ('key', 'key', 'coalesce'),
+    ),
+    'Goals': (
+        ('match_id', 'player_id', 'goal_minute', 'is_penalty', 'is_own_goal',
+         'is_free_kick', 'is_header', 'body_part', 'assist_type',
+         'assisted_by_player_id', 'goal_description', 'score_at_time'),
+        ('key', 'key', 'key', 'keep', 'keep', 'new', 'new', 'coalesce', 'coalesce',
+         'keep', 'coalesce', 'key'),
+    ),
+    'Substitutions': (
+        ('match_id', 'minute', 'player_in_id', 'player_out_id', 'substitution_reason'),
+        ('key', 'key', 'key', 'key', 'coalesce'),
+    ),
+    'Match_Events': (
+        ('match_id', 'event_minute', 'event_type', 'player_id', 'secondary_player_id',
+         'event_details', 'event_description'),
+        None,
+    ),
+}
+
+# Per child table, which columns after match_id hold player ids; parse_match_file
+# puts player names there and store_match_details swaps in the ids
+_PLAYER_ID_COLUMNS = {'player_id', 'secondary_player_id', 'assisted_by_player_id', 'player_in_id', 'player_out_id'}
+_PLAYER_COLUMNS = {
+    table: tuple(column in _PLAYER_ID_COLUMNS for column in columns[1:])
+    for table, (columns, _) in CHILD_UPSERTS.items()
+}
+
+# Keys and foreign keys of the buffered child tables. The UNIQUE keys are
+# always added when the schema is set up, since the staging merge probes them.
+# A --reset load creates these tables unlogged and leaves out the foreign keys
+# until finalize_schema runs at the end of the load.
+CHILD_CONSTRAINTS = {
+    'Match_Lineups': (
+        "FOREIGN KEY (match_id) REFERENCES public.Matches(match_id) ON DELETE CASCADE",
+        "FOREIGN KEY (player_id) REFERENCES public.Players(player_id) ON DELETE RESTRICT",
+        "UNIQUE (match_id, player_id)",
+    ),
+    'Reserve_Players': (
+        "FOREIGN KEY (match_id) REFERENCES public.Matches(match_id) ON DELETE CASCADE",
+        "FOREIGN KEY (player_id) REFERENCES public.Players(player_id) ON DELETE RESTRICT",
+        "UNIQUE (match_id, player_id)",
+    ),
+    'Goals': (
+        "FOREIGN KEY (match_id) REFERENCES public.Matches(match_id) ON DELETE CASCADE",
+        "FOREIGN KEY (player_id) REFERENCES public.Players(player_id) ON DELETE RESTRICT",
+        "FOREIGN KEY (assisted_by_player_id) REFERENCES public.Players(player_id) ON DELETE SET NULL",
+        "UNIQUE (match_id, player_id, goal_minute, score_at_time)",
+    ),
+    'Substitutions': (
+        "FOREIGN KEY (match_id) REFERENCES public.Matches(match_id) ON DELETE CASCADE",
+        "FOREIGN KEY (player_in_id) REFERENCES public.Players(player_id) ON DELETE RESTRICT",
+        "FOREIGN KEY (player_out_id) REFERENCES public.Players(player_id) ON DELETE RESTRICT",
+        "UNIQUE (match_id, minute, player_in_id, player_out_id)",
+    ),
+    'Match_Events': (
+        "FOREIGN KEY (match_id) REFERENCES public.Matches(match_id) ON DELETE CASCADE",
+        "FOREIGN KEY (player_id) REFERENCES public.Players(player_id) ON DELETE RESTRICT",
+        "FOREIGN KEY (secondary_player_id) REFERENCES public.Players(player_id) ON DELETE SET NULL",
+    ),
+}
+
+# Per child table: whether it is unlogged, has its UNIQUE key, has its foreign keys
+CHILD_TABLE_STATE_SQL = """
+    SELECT t, c.relpersistence = 'u',
+           EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = c.oid AND contype = 'u'),
+           EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = c.oid AND contype = 'f')
+    FROM unnest(%s) AS t
+    JOIN pg_class c ON c.oid = to_regclass('public.' || t)
+"""
+
+# Session settings for a --reset load. Skipping the WAL flush on commit is safe
+# there: a load that does not finish is simply re-run from scratch.
+RESET_LOAD_OPTIONS = "-c synchronous_commit=off"
+
+# SET expressions for the merge rules, with t the stored row and s the staged one
+_MERGE_EXPRESSIONS = {
+    'new': "s.{0}",
+    'coalesce': "COALESCE(s.{0}, t.{0})",
+    'greatest': "GREATEST(t.{0}, s.{0})",
+    'or': "t.{0} OR s.{0}",
+}
+
+# Backslash escapes for the COPY text format
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_value(value) -> str:
+    """Render one value as a COPY text-format field."""
+    if value is None:
+        return '\\N'
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def stage_table(table: str) -> str:
+    """Unlogged staging table that child rows are COPYed into before the merge."""
+    return f"public.{table.lower()}_stage"
+
+
+def stage_merge_statements(table: str) -> List[str]:
+    """UPDATE and INSERT statements that merge a table's staging rows into it."""
+    columns, rules = CHILD_UPSERTS[table]
+    cols = ', '.join(columns)
+    insert = f"INSERT INTO public.{table} ({cols}) SELECT {cols} FROM {stage_table(table)} AS s"
+    if rules is None:
+        return [insert]
+    
+    # Update the rows that already exist, then insert the rest; unlike
+    # ON CONFLICT this never draws serial ids for rows that turn out to exist
+    match = ' AND '.join(f"t.{col} = s.{col}" for col, rule in zip(columns, rules) if rule == 'key')
+    updates = ', '.join(
+        f"{col} = {_MERGE_EXPRESSIONS[rule].format(col)}"
+        for col, rule in zip(columns, rules)
+        if rule in _MERGE_EXPRESSIONS
+    )
+    return [
+        f"UPDATE public.{table} AS t SET {updates} FROM {stage_table(table)} AS s WHERE {match}",
+        f"{insert} WHERE NOT EXISTS (SELECT 1 FROM public.{table} AS t WHERE {match})",
+    ]
+
+
+def add_constraints_statement(table: str, kind: str) -> Optional[str]:
+    """ALTER TABLE statement that adds a child table's CHILD_CONSTRAINTS of one
+    kind ('UNIQUE' or 'FOREIGN KEY'), or None if it has none."""
+    constraints = [constraint for constraint in CHILD_CONSTRAINTS[table] if constraint.startswith(kind)]
+    if not constraints:
+        return None
+    return f"ALTER TABLE public.{table} " + ', '.join(f"ADD {constraint}" for constraint in constraints)
+
+
+def merge_upsert_row(previous: tuple, row: tuple, rules: Tuple[str, ...]) -> tuple:
+    """Fold a row into an earlier one with the same key, as the staging merge would."""
+    merged = []
+    for old, new, rule in zip(previous, row, rules):
+        if rule in ('key', 'keep'):
+            merged.append(old)
+        elif rule == 'new':
+            merged.append(new)
+        elif rule == 'coalesce':
+            merged.append(old if new is None else new)
+        elif rule == 'greatest':
+            merged.append(max((value for value in (old, new) if value is not None), default=None))
+        else:  # 'or'
+            merged.append(old or new)
+    return tuple(merged)
+
+
+def strip_accents(text: str) -> str:
+    """Decompose with NFKD and drop combining marks; ASCII text is returned as is."""
+    if text.isascii():
+        return text
+    if not unicodedata.is_normalized('NFKD', text):
+        text = unicodedata.normalize('NFKD', text)
+    return text.translate(_COMBINING_MARKS)
+
+
 def normalize_text(value: str) -> str:
     if not value:
         return ""
     txt = value.strip()
-    txt = unicodedata.normalize('NFKD', txt)
-    txt = ''.join(ch for ch in txt if not unicodedata.combining(ch))
-    txt = re.sub(r"\s+", " ", txt)
+    txt = strip_accents(txt)
+    txt = _WS_RE.sub(" ", txt)
     return txt.strip()
 
 
+@lru_cache(maxsize=65536)
 def normalize_player_name(raw: str) -> str:
     if not raw:
         return ""
     text = raw.strip()
-    text = re.sub(r"^\s*\d+[\)\.]?\s+", "", text)  # leading jersey number
-    text = re.sub(r"\s+\d+$", "", text)               # trailing number
-    text = re.sub(r"[,;]+", " ", text)
-    text = unicodedata.normalize('NFKD', text)
-    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
-    text = re.sub(r"[^A-Za-z\-\'\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _LEADING_JERSEY_RE.sub("", text)  # leading jersey number
+    text = _TRAILING_NUMBER_RE.sub("", text)  # trailing number
+    text = _NAME_SEPARATORS_RE.sub(" ", text)
+    text = strip_accents(text)
+    text = _NON_NAME_CHARS_RE.sub(" ", text)
+    text = _WS_RE.sub(" ", text).strip()
     return text
 
 
@@ -64,18 +397,8 @@ def parse_german_date(date_str: str) -> Optional[date]:
     # Clean the string
     date_str = normalize_text(date_str)
     
-    # Common patterns
-    patterns = [
-        # DD.MM.YYYY format
-        (r"(\d{1,2})\.(\d{1,2})\.(\d{4})", "%d.%m.%Y"),
-        # DD.MM.YY format
-        (r"(\d{1,2})\.(\d{1,2})\.(\d{2})", "%d.%m.%y"),
-        # YYYY-MM-DD format
-        (r"(\d{4})-(\d{1,2})-(\d{1,2})", "%Y-%m-%d"),
-    ]
-    
-    for pattern, fmt in patterns:
-        match = re.search(pattern, date_str)
+    for pattern, fmt in _DATE_PATTERNS:
+        match = pattern.search(date_str)
         if match:
             try:
                 if fmt in ["%d.%m.%Y", "%d.%m.%y"]:
@@ -88,6 +411,307 @@ def parse_german_date(date_str: str) -> Optional[date]:
     return None
 
 
+def see_player(players: list, name: str, link: Optional[str]) -> Optional[str]:
+    """Normalize a player name and note the lookup; None when the name is empty.
+    
+    The main process replays the noted lookups in order, so player ids come
+    out exactly as if every file had been parsed there.
+    """
+    name = normalize_player_name(name)
+    if not name:
+        return None
+    players.append((name, link))
+    return name
+
+
+def extract_match_metadata(text: str) -> Dict[str, Any]:
+    """Extract detailed match metadata including date, time, weather, etc."""
+    updates = {}
+    
+    # Extract date and time
+    for pattern in _KICKOFF_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            try:
+                if len(match.groups()) == 6:  # Has day of week
+                    day, month, year, hour, minute = match.groups()[1:]
+                else:
+                    day, month, year, hour, minute = match.groups()
+                
+                match_date = date(int(year), int(month), int(day))
+                match_time = f"{hour}:{minute}:00"
+                updates['match_date'] = match_date
+                updates['match_time'] = match_time
+                break
+            except (ValueError, IndexError):
+                continue
+    
+    # Extract attendance
+    for pattern in _ATTENDANCE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            try:
+                attendance = int(match.group(1).replace('.', ''))
+                updates['attendance'] = attendance
+                break
+            except (ValueError, IndexError):
+                continue
+    
+    # Extract weather information; one scan finds where each keyword first occurs
+    first_seen = {}
+    for match in _WEATHER_KEYWORD_RE.finditer(text):
+        first_seen.setdefault(match.group(), match.start())
+    
+    weather_text = []
+    for keyword, pattern in _WEATHER_CONTEXT:
+        if keyword in first_seen:
+            # Extract surrounding context; no match can start more than 20 characters earlier
+            match = pattern.search(text, max(first_seen[keyword] - 20, 0))
+            if match:
+                weather_text.append(match.group().strip())
+    
+    if weather_text:
+        updates['weather_conditions'] = '; '.join(set(weather_text))
+    
+    # Extract temperature
+    temp_match = _TEMPERATURE_RE.search(text)
+    if temp_match:
+        try:
+            updates['temperature_celsius'] = int(temp_match.group(1))
+        except ValueError:
+            pass
+    
+    return updates
+
+
+def parse_enhanced_lineups(tree: lxml.html.HtmlElement, players: list) -> List[tuple]:
+    """Enhanced lineup parsing with position and formation data."""
+    rows = []
+    # Nested tables list the same links again under a later row_index;
+    # each link and each cell is still only parsed once
+    links_seen = {}
+    cells_seen = {}
+    for row_index, table in enumerate(_PLAYER_TABLES(tree), start=1):
+        for col_index, link in enumerate(_PLAYER_LINKS(table), start=1):
+            if link not in links_seen:
+                cell = None
+                parent_tds = _PARENT_TD(link)
+                if parent_tds:
+                    parent_td = parent_tds[0]
+                    if parent_td not in cells_seen:
+                        cells_seen[parent_td] = parse_lineup_cell(parent_td)
+                    cell = cells_seen[parent_td]
+                
+                name = see_player(players, stripped_text(link), link.get('href'))
+                links_seen[link] = (name, _IN_BOLD(link), cell)
+            
+            name, is_captain, cell = links_seen[link]
+            if not name:
+                continue
+            
+            # Infer the position from the table's place in the layout
+            position_played = _ROW_POSITIONS.get(row_index) if cell else None
+            (jersey_number, substituted_minute, yellow_card, red_card,
+             yellow_count, second_yellow, minutes_played) = cell or _NO_CELL
+            
+            rows.append((name, True, is_captain, jersey_number, 
+                         position_played, substituted_minute, yellow_card, red_card, 
+                         yellow_count, second_yellow, row_index, col_index, minutes_played))
+    
+    return rows
+
+
+def parse_reserve_players(tree: lxml.html.HtmlElement, players: list) -> List[tuple]:
+    """Parse reserve/bench players from match files."""
+    # Look for "Reserve:" section
+    reserve_text = next((text for text in _TEXT_XPATH(tree) if _RESERVE_RE.search(text)), None)
+    if reserve_text is None:
+        return []
+    
+    # Find the table after "Reserve:" text
+    reserve_table = find_next_table(reserve_text)
+    if reserve_table is None:
+        return []
+    
+    # Extract reserve players
+    rows = []
+    for link in _PLAYER_LINKS(reserve_table):
+        player_text = stripped_text(link)
+        
+        # Try to extract jersey number
+        jersey_number = None
+        jersey_match = _JERSEY_RE.search(player_text)
+        if jersey_match:
+            jersey_number = int(jersey_match.group(1))
+        
+        name = see_player(players, player_text, link.get('href'))
+        if name:
+            rows.append((name, jersey_number))
+    
+    return rows
+
+
+def parse_enhanced_goals(tree: lxml.html.HtmlElement, players: list) -> List[tuple]:
+    """Enhanced goal parsing with more detailed metadata."""
+    goals_header = next(
+        (bold for bold in tree.iter('b') if _GOALS_HEADER_RE.search(element_string(bold) or '')),
+        None,
+    )
+    if goals_header is None:
+        return []
+    
+    goal_table = find_next_table(goals_header)
+    if goal_table is None:
+        return []
+    
+    rows = []
+    for cell in goal_table.iterdescendants('td'):
+        entry = stripped_text(cell)
+        if not entry or not _MINUTE_RE.search(entry):
+            continue
+        
+        # Enhanced goal parsing with more details
+        for pattern in _GOAL_PATTERNS:
+            match = pattern.match(entry)
+            if match:
+                minute = int(match.group(1))
+                score = match.group(2)
+                scorer_text = normalize_player_name(match.group(3))
+                additional_info = match.group(4) if len(match.groups()) >= 4 else None
+                
+                # Detect goal type
+                is_penalty = any(keyword in entry.lower() for keyword in ['elfmeter', 'penalty', '11m', 'fe'])
+                is_free_kick = any(keyword in entry.lower() for keyword in ['freistoß', 'freistoss', 'free kick'])
+                is_header = any(keyword in entry.lower() for keyword in ['kopf', 'header', 'kopfball'])
+                
+                # Detect body part
+                body_part = None
+                if 'links' in entry.lower():
+                    body_part = 'left_foot'
+                elif 'rechts' in entry.lower():
+                    body_part = 'right_foot'
+                elif is_header:
+                    body_part = 'head'
+                
+                # Get scorer
+                scorer_links = _PLAYER_LINKS(cell)
+                if scorer_links:
+                    scorer_link = scorer_links[0]
+                    scorer_name = normalize_player_name(stripped_text(scorer_link))
+                    scorer_href = scorer_link.get('href')
+                else:
+                    scorer_name = scorer_text
+                    scorer_href = None
+                
+                # Parse assist information from additional_info
+                assister = None
+                assist_type = None
+                if additional_info:
+                    assister_text = normalize_player_name(additional_info)
+                    if assister_text:
+                        assister = see_player(players, assister_text, None)
+                        # Try to detect assist type
+                        if 'flanke' in additional_info.lower():
+                            assist_type = 'cross'
+                        elif 'pass' in additional_info.lower():
+                            assist_type = 'pass'
+                        else:
+                            assist_type = 'assist'
+                
+                scorer = see_player(players, scorer_name, scorer_href)
+                if scorer:
+                    rows.append((scorer, minute, is_penalty, False,
+                                 is_free_kick, is_header, body_part, assist_type,
+                                 assister, entry, score))
+                break
+    
+    return rows
+
+
+def parse_enhanced_substitutions(all_text: str, players: list) -> List[tuple]:
+    """Enhanced substitution parsing with context and reasoning."""
+    
+    rows = []
+    for pattern in _SUBSTITUTION_PATTERNS:
+        for match in pattern.finditer(all_text):
+            minute = int(match.group(1))
+            player_in_text = normalize_player_name(match.group(2))
+            player_out_text = normalize_player_name(match.group(3))
+            
+            # Try to detect substitution reason from surrounding context
+            context_start = max(0, match.start() - 100)
+            context_end = min(len(all_text), match.end() + 100)
+            context = all_text[context_start:context_end].lower()
+            
+            reason = None
+            if any(word in context for word in ['verletzt', 'injury', 'injured']):
+                reason = 'injury'
+            elif any(word in context for word in ['gelb', 'yellow', 'karte']):
+                reason = 'yellow_card'
+            elif any(word in context for word in ['taktisch', 'tactical']):
+                reason = 'tactical'
+            else:
+                reason = 'tactical'  # Default assumption
+            
+            player_in = see_player(players, player_in_text, None)
+            player_out = see_player(players, player_out_text, None)
+            
+            if player_in and player_out:
+                rows.append((minute, player_in, player_out, reason))
+    
+    return rows
+
+
+def extract_match_events(all_text: str, players: list) -> List[tuple]:
+    """Extract all match events for timeline reconstruction."""
+    events = []
+    
+    # This would be a comprehensive event extraction combining goals, cards, substitutions
+    # into a unified timeline - placeholder for now
+    
+    # Extract yellow cards
+    for match in _YELLOW_CARD_RE.finditer(all_text):
+        minute = int(match.group(1))
+        player_name = normalize_player_name(match.group(2))
+        if see_player(players, player_name, None):
+            events.append((minute, 'yellow_card', player_name, None, '{}', f"Yellow card: {player_name}"))
+    
+    return events
+
+
+def parse_match_file(match_url: str) -> Optional[Dict[str, Any]]:
+    """Parse one match file without touching the database; None if it cannot be read.
+    
+    Returns the Matches updates under 'metadata', the player lookups under
+    'players' and the child rows per table. The rows leave out match_id and
+    hold normalized player names where the tables store player ids.
+    """
+    fp = Path(match_url)
+    if not match_url or not fp.exists():
+        return None
+    
+    try:
+        tree = read_html(fp)
+    except Exception as e:
+        logging.getLogger("enhanced_ingest").warning("Failed to read match file %s: %s", match_url, e)
+        return None
+    
+    # Collect the text nodes once for the text-based parsers
+    text_nodes = _TEXT_XPATH(tree)
+    text = "".join(text_nodes)
+    
+    players = []
+    return {
+        'metadata': extract_match_metadata(text),
+        'Match_Lineups': parse_enhanced_lineups(tree, players),
+        'Reserve_Players': parse_reserve_players(tree, players),
+        'Goals': parse_enhanced_goals(tree, players),
+        'Substitutions': parse_enhanced_substitutions(" ".join(text_nodes), players),
+        'Match_Events': extract_match_events(text, players),
+        'players': players,
+    }
+
+
 class EnhancedPGIngestor:
     def __init__(self, base_path: Path, reset: bool = False, mirror_sqlite: Optional[Path] = None):
         self.base_path = Path(base_path)
@@ -96,6 +720,21 @@ class EnhancedPGIngestor:
         self.mirror_sqlite = Path(mirror_sqlite) if mirror_sqlite else None
         self.logger = logging.getLogger("enhanced_ingest")
         
+        # Child rows waiting for the next flush, per table
+        self.pending_rows = {table: {} for table in CHILD_UPSERTS}
+        
+        # Normalized player name -> player_id, filled by get_or_create_player
+        self.player_ids: Dict[str, int] = {}
+        
+        # Set when flush_rows had to drop rows; the season's files then
+        # stay out of the manifest so the next run parses them again
+        self.flush_failed = False
+        
+        # Match file (relative to base_path) -> [mtime_ns, size] when it was
+        # last ingested; --reset drops the data, so it starts from scratch
+        self.manifest_path = self.base_path / MANIFEST_NAME
+        self.manifest: Dict[str, List[int]] = {} if reset else self._load_manifest()
+        
         # Initialize connection - will be refreshed as needed
         self.conn = None
         self._reconnect()
@@ -107,7 +746,8 @@ class EnhancedPGIngestor:
             'players_found': 0,
             'competitions_found': set(),
             'errors': [],
-            'files_processed': 0
+            'files_processed': 0,
+            'files_skipped': 0
         }
 
     def _reconnect(self):
@@ -117,9 +757,32 @@ class EnhancedPGIngestor:
                 self.conn.close()
             except:
                 pass
-        self.conn = psycopg2.connect(self.config.build_psycopg2_dsn())
+        self.conn = psycopg2.connect(
+            self.config.build_psycopg2_dsn(),
+            options=RESET_LOAD_OPTIONS if self.reset else None,
+        )
+        # Start over with ids read through the new connection
+        self.player_ids.clear()
         self.logger.debug("Database connection refreshed")
 
+    def _load_manifest(self) -> Dict[str, List[int]]:
+        """Read the ingest manifest; a missing or unreadable one counts as empty."""
+        try:
+            with self.manifest_path.open('r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning("Ignoring unreadable manifest %s: %s", self.manifest_path, e)
+            return {}
+
+    def _save_manifest(self) -> None:
+        """Write the manifest to a temporary file and move it into place."""
+        tmp_path = self.manifest_path.with_name(MANIFEST_NAME + '.tmp')
+        with tmp_path.open('w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
     def _safe_execute(self, query, params=None, max_retries=3):
         """Execute query with connection retry logic."""
         for attempt in range(max_retries):
@@ -276,33 +939,58 @@ class EnhancedPGIngestor:
                     UNIQUE(season_id, gameday, opponent_id)
                 );
                 
+                CREATE TABLE IF NOT EXISTS public.Player_Season_Stats (
+                    stat_id SERIAL PRIMARY KEY,
+                    player_id INTEGER REFERENCES public.Players(player_id) ON DELETE CASCADE,
+                    season_id INTEGER REFERENCES public.Seasons(season_id) ON DELETE CASCADE,
+                    competition_id INTEGER REFERENCES public.Competitions(competition_id) ON DELETE SET NULL,
+                    season_label TEXT,
+                    competition TEXT,
+                    appearances INTEGER,
+                    starts INTEGER,
+                    minutes_played INTEGER,
+                    subs_on INTEGER,
+                    subs_off INTEGER,
+                    goals INTEGER,
+                    assists INTEGER,
+                    yellow_cards INTEGER,
+                    second_yellow_cards INTEGER,
+                    red_cards INTEGER,
+                    penalties_scored INTEGER,
+                    penalties_missed INTEGER,
+                    UNIQUE(player_id, season_label, competition)
+                );
+            """)
+            
+            # Buffered child tables; see CHILD_CONSTRAINTS for their keys
+            persistence = "UNLOGGED " if self.reset else ""
+            cur.execute(f"""
                 -- Reserve/bench players table
-                CREATE TABLE IF NOT EXISTS public.Reserve_Players (
+                CREATE {persistence}TABLE IF NOT EXISTS public.Reserve_Players (
                     reserve_id SERIAL PRIMARY KEY,
-                    match_id INTEGER REFERENCES public.Matches(match_id) ON DELETE CASCADE,
-                    player_id INTEGER REFERENCES public.Players(player_id) ON DELETE RESTRICT,
+                    match_id INTEGER,
+                    player_id INTEGER,
                     jersey_number INTEGER,
-                    position_group TEXT, -- 'goalkeeper', 'defense', 'midfield', 'attack'
-                    UNIQUE(match_id, player_id)
+                    position_group TEXT -- 'goalkeeper', 'defense', 'midfield', 'attack'
                 );
                 
                 -- Enhanced match events for timeline reconstruction
-                CREATE TABLE IF NOT EXISTS public.Match_Events (
+                CREATE {persistence}TABLE IF NOT EXISTS public.Match_Events (
                     event_id SERIAL PRIMARY KEY,
-                    match_id INTEGER REFERENCES public.Matches(match_id) ON DELETE CASCADE,
+                    match_id INTEGER,
                     event_minute INTEGER,
                     event_type TEXT, -- 'goal', 'yellow_card', 'red_card', 'substitution', 'penalty'
-                    player_id INTEGER REFERENCES public.Players(player_id) ON DELETE RESTRICT,
-                    secondary_player_id INTEGER REFERENCES public.Players(player_id) ON DELETE SET NULL,
+                    player_id INTEGER,
+                    secondary_player_id INTEGER,
                     event_details JSONB,
                     event_description TEXT
                 );
                 
                 -- Existing tables with enhancements...
-                CREATE TABLE IF NOT EXISTS public.Match_Lineups (
+                CREATE {persistence}TABLE IF NOT EXISTS public.Match_Lineups (
                     lineup_id SERIAL PRIMARY KEY,
-                    match_id INTEGER REFERENCES public.Matches(match_id) ON DELETE CASCADE,
-                    player_id INTEGER REFERENCES public.Players(player_id) ON DELETE RESTRICT,
+                    match_id INTEGER,
+                    player_id INTEGER,
                     is_starter BOOLEAN,
                     is_captain BOOLEAN,
                     jersey_number INTEGER,
@@ -316,14 +1004,13 @@ class EnhancedPGIngestor:
                     position_row INTEGER,
                     position_col INTEGER,
                     minutes_played INTEGER,
-                    rating DECIMAL(3,1),
-                    UNIQUE(match_id, player_id)
+                    rating DECIMAL(3,1)
                 );
                 
-                CREATE TABLE IF NOT EXISTS public.Goals (
+                CREATE {persistence}TABLE IF NOT EXISTS public.Goals (
                     goal_id SERIAL PRIMARY KEY,
-                    match_id INTEGER REFERENCES public.Matches(match_id) ON DELETE CASCADE,
-                    player_id INTEGER REFERENCES public.Players(player_id) ON DELETE RESTRICT,
+                    match_id INTEGER,
+                    player_id INTEGER,
                     goal_minute INTEGER,
                     goal_second INTEGER DEFAULT 0,
                     is_penalty BOOLEAN,
@@ -332,48 +1019,40 @@ class EnhancedPGIngestor:
                     is_header BOOLEAN DEFAULT FALSE,
                     body_part TEXT, -- 'left_foot', 'right_foot', 'head', 'chest', etc.
                     assist_type TEXT, -- 'pass', 'cross', 'rebound', etc.
-                    assisted_by_player_id INTEGER REFERENCES public.Players(player_id) ON DELETE SET NULL,
+                    assisted_by_player_id INTEGER,
                     goal_description TEXT,
                     score_at_time TEXT,
-                    distance_meters INTEGER,
-                    UNIQUE(match_id, player_id, goal_minute, score_at_time)
+                    distance_meters INTEGER
                 );
                 
-                CREATE TABLE IF NOT EXISTS public.Substitutions (
+                CREATE {persistence}TABLE IF NOT EXISTS public.Substitutions (
                     substitution_id SERIAL PRIMARY KEY,
-                    match_id INTEGER REFERENCES public.Matches(match_id) ON DELETE CASCADE,
+                    match_id INTEGER,
                     minute INTEGER,
                     second INTEGER DEFAULT 0,
-                    player_in_id INTEGER REFERENCES public.Players(player_id) ON DELETE RESTRICT,
-                    player_out_id INTEGER REFERENCES public.Players(player_id) ON DELETE RESTRICT,
+                    player_in_id INTEGER,
+                    player_out_id INTEGER,
                     substitution_reason TEXT, -- 'tactical', 'injury', 'yellow_card', 'performance'
-                    formation_change BOOLEAN DEFAULT FALSE,
-                    UNIQUE(match_id, minute, player_in_id, player_out_id)
-                );
-                
-                CREATE TABLE IF NOT EXISTS public.Player_Season_Stats (
-                    stat_id SERIAL PRIMARY KEY,
-                    player_id INTEGER REFERENCES public.Players(player_id) ON DELETE CASCADE,
-                    season_id INTEGER REFERENCES public.Seasons(season_id) ON DELETE CASCADE,
-                    competition_id INTEGER REFERENCES public.Competitions(competition_id) ON DELETE SET NULL,
-                    season_label TEXT,
-                    competition TEXT,
-                    appearances INTEGER,
-                    starts INTEGER,
-                    minutes_played INTEGER,
-                    subs_on INTEGER,
-                    subs_off INTEGER,
-                    goals INTEGER,
-                    assists INTEGER,
-                    yellow_cards INTEGER,
-                    second_yellow_cards INTEGER,
-                    red_cards INTEGER,
-                    penalties_scored INTEGER,
-                    penalties_missed INTEGER,
-                    UNIQUE(player_id, season_label, competition)
+                    formation_change BOOLEAN DEFAULT FALSE
                 );
             """)
             
+            # The staging merge probes the UNIQUE keys, so they go in right away,
+            # also on --reset; without them every flush scans the whole table
+            cur.execute(CHILD_TABLE_STATE_SQL, (list(CHILD_CONSTRAINTS),))
+            for table, _, has_keys, _ in cur.fetchall():
+                statement = add_constraints_statement(table, 'UNIQUE')
+                if statement and not has_keys:
+                    cur.execute(statement)
+            
+            # Unlogged staging tables that flush_rows COPYs into
+            for table, (columns, _) in CHILD_UPSERTS.items():
+                cur.execute(f"""
+                    DROP TABLE IF EXISTS {stage_table(table)};
+                    CREATE UNLOGGED TABLE {stage_table(table)} AS
+                    SELECT {', '.join(columns)} FROM public.{table} WITH NO DATA;
+                """)
+            
             # Insert default competitions
             competitions = [
                 ('Bundesliga', 'league', 'German first division'),
@@ -386,12 +1065,32 @@ class EnhancedPGIngestor:
                 ('Amateur League', 'amateur', 'Amateur team competitions')
             ]
             
-            for name, comp_type, desc in competitions:
-                cur.execute("""
-                    INSERT INTO public.Competitions (competition_name, competition_type, description)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (competition_name) DO NOTHING
-                """, (name, comp_type, desc))
+            execute_values(cur, """
+                INSERT INTO public.Competitions (competition_name, competition_type, description)
+                VALUES %s
+                ON CONFLICT (competition_name) DO NOTHING
+            """, competitions)
+        
+        # New child tables get their foreign keys here, and so do tables left
+        # unlogged by a --reset load that died; --reset itself adds them at the end
+        if not self.reset:
+            self.finalize_schema()
+
+    def finalize_schema(self) -> None:
+        """Make the child tables logged and add the foreign keys they are missing.
+        
+        A --reset load leaves both out until the end of the load. Every other run
+        calls this at startup, so tables left behind by a load that died are
+        finished then.
+        """
+        with self.conn, self.conn.cursor() as cur:
+            cur.execute(CHILD_TABLE_STATE_SQL, (list(CHILD_CONSTRAINTS),))
+            for table, unlogged, _, has_foreign_keys in cur.fetchall():
+                if unlogged:
+                    cur.execute(f"ALTER TABLE public.{table} SET LOGGED")
+                if not has_foreign_keys:
+                    self.logger.info("Adding foreign keys to %s", table)
+                    cur.execute(add_constraints_statement(table, 'FOREIGN KEY'))
 
     def discover_season_files(self, season_dir: Path) -> Dict[str, List[Path]]:
         """Comprehensively discover all available files for a season."""
@@ -405,446 +1104,124 @@ class EnhancedPGIngestor:
             'other': []
         }
         
-        if not season_dir.exists():
+        # Read the directory once; every lookup below is a set membership test
+        try:
+            with os.scandir(season_dir) as entries:
+                names = [entry.name for entry in entries if entry.is_file()]
+        except FileNotFoundError:
             return files
+        present = set(names)
         
         # League overview files
         for filename in ['profiliga.html', 'profitab.html', 'profitabb.html', 'profitop.html']:
-            fp = season_dir / filename
-            if fp.exists():
-                files['league_overview'].append(fp)
+            if filename in present:
+                files['league_overview'].append(season_dir / filename)
         
         # Cup and friendly matches
         for filename in ['profipokal.html', 'profirest.html']:
-            fp = season_dir / filename
-            if fp.exists():
-                files['cup_matches' if 'pokal' in filename else 'friendly_matches'].append(fp)
+            if filename in present:
+                files['cup_matches' if 'pokal' in filename else 'friendly_matches'].append(season_dir / filename)
         
         # Individual match files
         for pattern in ['profiliga*.html', 'profipokal*.html', 'profirest*.html']:
-            for fp in season_dir.glob(pattern):
-                if fp.name not in ['profiliga.html', 'profipokal.html', 'profirest.html']:
-                    files['individual_matches'].append(fp)
+            for name in fnmatch.filter(names, pattern):
+                if name not in ['profiliga.html', 'profipokal.html', 'profirest.html']:
+                    files['individual_matches'].append(season_dir / name)
         
         # Statistics files
         for filename in ['profikarten.html', 'profitore.html', 'profistat.html', 'profiverlauf.gif']:
-            fp = season_dir / filename
-            if fp.exists():
-                files['statistics'].append(fp)
+            if filename in present:
+                files['statistics'].append(season_dir / filename)
         
         # Calendar file
-        calendar_file = season_dir / 'kalender.html'
-        if calendar_file.exists():
-            files['calendar'].append(calendar_file)
+        if 'kalender.html' in present:
+            files['calendar'].append(season_dir / 'kalender.html')
         
         self.logger.debug("Season %s files discovered: %s", season_dir.name, {k: len(v) for k, v in files.items()})
         return files
 
     def parse_enhanced_match_details(self, match_id: int, match_url: str) -> None:
         """Enhanced match detail parsing with comprehensive data extraction."""
-        fp = Path(match_url)
-        if not match_url or not fp.exists():
-            return
-        
-        try:
-            with fp.open('r', encoding='utf-8', errors='ignore') as f:
-                soup = BeautifulSoup(f, 'lxml')
-        except Exception as e:
-            self.logger.warning("Failed to read match file %s: %s", match_url, e)
-            return
-        
-        # Extract enhanced match metadata
-        self._extract_match_metadata(match_id, soup)
-        
-        # Parse lineups with enhanced position data
-        self._parse_enhanced_lineups(match_id, soup)
-        
-        # Parse reserve/bench players
-        self._parse_reserve_players(match_id, soup)
-        
-        # Enhanced goal parsing
-        self._parse_enhanced_goals(match_id, soup)
-        
-        # Enhanced substitution parsing
-        self._parse_enhanced_substitutions(match_id, soup)
-        
-        # Extract match events timeline
-        self._extract_match_events(match_id, soup)
+        self.store_match_details(match_id, parse_match_file(match_url))
 
-    def _extract_match_metadata(self, match_id: int, soup: BeautifulSoup) -> None:
-        """Extract detailed match metadata including date, time, weather, etc."""
-        text = soup.get_text()
-        updates = {}
-        
-        # Extract date and time
-        date_patterns = [
-            r"(\w{2})\.\s*(\d{1,2})\.(\d{1,2})\.(\d{4}),?\s*(\d{1,2})[:.](\d{2})",
-            r"(\d{1,2})\.(\d{1,2})\.(\d{4}),?\s*(\d{1,2})[:.](\d{2})"
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text)
-            if match:
-                try:
-                    if len(match.groups()) == 6:  # Has day of week
-                        day, month, year, hour, minute = match.groups()[1:]
-                    else:
-                        day, month, year, hour, minute = match.groups()
-                    
-                    match_date = date(int(year), int(month), int(day))
-                    match_time = f"{hour}:{minute}:00"
-                    updates['match_date'] = match_date
-                    updates['match_time'] = match_time
-                    break
-                except (ValueError, IndexError):
-                    continue
-        
-        # Extract attendance
-        attendance_patterns = [
-            r"(\d{1,3}(?:\.\d{3})+)\s*Zuschauer",
-            r"(\d{3,6})\s*Zuschauer"
-        ]
-        
-        for pattern in attendance_patterns:
-            match = re.search(pattern, text)
-            if match:
-                try:
-                    attendance = int(match.group(1).replace('.', ''))
-                    updates['attendance'] = attendance
-                    break
-                except (ValueError, IndexError):
-                    continue
-        
-        # Extract weather information
-        weather_keywords = ['Regen', 'Schnee', 'Sonne', 'bewölkt', 'Nebel', '°C', 'Grad']
-        weather_text = []
-        for keyword in weather_keywords:
-            if keyword in text:
-                # Extract surrounding context
-                pattern = rf".{{0,20}}{re.escape(keyword)}.{{0,20}}"
-                match = re.search(pattern, text)
-                if match:
-                    weather_text.append(match.group().strip())
-        
-        if weather_text:
-            updates['weather_conditions'] = '; '.join(set(weather_text))
-        
-        # Extract temperature
-        temp_match = re.search(r"(-?\d+)\s*°C", text)
-        if temp_match:
-            try:
-                updates['temperature_celsius'] = int(temp_match.group(1))
-            except ValueError:
-                pass
-        
-        # Update match record
-        if updates:
-            with self.conn, self.conn.cursor() as cur:
-                set_clauses = []
-                values = []
-                for key, value in updates.items():
-                    set_clauses.append(f"{key} = %s")
-                    values.append(value)
-                
-                if set_clauses:
-                    query = f"UPDATE public.Matches SET {', '.join(set_clauses)} WHERE match_id = %s"
-                    values.append(match_id)
-                    cur.execute(query, values)
-
-    def _parse_enhanced_lineups(self, match_id: int, soup: BeautifulSoup) -> None:
-        """Enhanced lineup parsing with position and formation data."""
-        row_index = 0
-        for table in soup.find_all('table'):
-            links = table.find_all('a', href=re.compile(r'../spieler/'))
-            if not links:
-                continue
-            
-            row_index += 1
-            col_index = 0
-            
-            for link in links:
-                col_index += 1
-                name = normalize_player_name(link.get_text(strip=True))
-                href = link.get('href')
-                is_captain = link.find_parent('b') is not None
-                
-                # Enhanced position detection
-                parent_td = link.find_parent('td')
-                position_played = None
-                minutes_played = None
-                
-                if parent_td:
-                    # Try to infer position from table structure
-                    if row_index == 1:  # Goalkeeper row
-                        position_played = 'GK'
-                    elif row_index == 2:  # Defense
-                        position_played = 'DEF'
-                    elif row_index == 3:  # Midfield
-                        position_played = 'MID'  
-                    elif row_index == 4:  # Attack
-                        position_played = 'ATT'
-                
-                # Parse existing card and substitution data
-                yellow_card = red_card = False
-                yellow_count = 0
-                second_yellow = False
-                jersey_number = None
-                substituted_minute = None
-                
-                if parent_td:
-                    parent_html = str(parent_td)
-                    parent_text = parent_td.get_text()
-                    
-                    # Enhanced card detection
-                    yellow_count = parent_html.count('gelbekarte') + parent_text.count('🟨')
-                    red_card = ('rotekarte' in parent_html.lower()) or ('🟥' in parent_text)
-                    yellow_card = yellow_count > 0
-                    second_yellow = ('gelb-rot' in parent_html.lower()) or ('gelbrot' in parent_html.lower())
-                    
-                    # Jersey number
-                    mnum = re.search(r'^(\s*)(\d+)', parent_text)
-                    if mnum:
-                        jersey_number = int(mnum.group(2))
-                    
-                    # Substitution minute (if substituted out)
-                    sub_match = re.search(r'(\d+)\..*(?:aus|raus|off)', parent_text, re.IGNORECASE)
-                    if sub_match:
-                        substituted_minute = int(sub_match.group(1))
-                        minutes_played = substituted_minute
-                    else:
-                        minutes_played = 90  # Full match if not substituted
-                
-                player_id = self.get_or_create_player(name, href)
-                if not player_id:
-                    continue
-                
-                with self.conn, self.conn.cursor() as cur:
-                    try:
-                        cur.execute("""
-                            INSERT INTO public.Match_Lineups 
-                            (match_id, player_id, is_starter, is_captain, jersey_number, 
-                             position_played, substituted_minute, yellow_card, red_card, 
-                             yellow_card_count, second_yellow, position_row, position_col,
-                             minutes_played)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (match_id, player_id) DO UPDATE SET
-                                is_starter = EXCLUDED.is_starter,
-                                is_captain = EXCLUDED.is_captain,
-                                position_played = COALESCE(EXCLUDED.position_played, public.Match_Lineups.position_played),
-                                jersey_number = COALESCE(EXCLUDED.jersey_number, public.Match_Lineups.jersey_number),
-                                substituted_minute = COALESCE(EXCLUDED.substituted_minute, public.Match_Lineups.substituted_minute),
-                                yellow_card = EXCLUDED.yellow_card,
-                                red_card = EXCLUDED.red_card,
-                                yellow_card_count = GREATEST(public.Match_Lineups.yellow_card_count, EXCLUDED.yellow_card_count),
-                                second_yellow = public.Match_Lineups.second_yellow OR EXCLUDED.second_yellow,
-                                minutes_played = COALESCE(EXCLUDED.minutes_played, public.Match_Lineups.minutes_played)
-                        """, (match_id, player_id, True, is_captain, jersey_number, 
-                              position_played, substituted_minute, yellow_card, red_card, 
-                              yellow_count, second_yellow, row_index, col_index, minutes_played))
-                    except Exception as e:
-                        self.logger.debug("Enhanced lineup upsert failed (match %s, player %s): %s", 
-                                        match_id, player_id, e)
-
-    def _parse_reserve_players(self, match_id: int, soup: BeautifulSoup) -> None:
-        """Parse reserve/bench players from match files."""
-        # Look for "Reserve:" section
-        reserve_text = soup.find(string=re.compile(r'Reserve:', re.IGNORECASE))
-        if not reserve_text:
-            return
-        
-        # Find the table after "Reserve:" text
-        reserve_table = reserve_text.find_next('table')
-        if not reserve_table:
-            return
-        
-        # Extract reserve players
-        for link in reserve_table.find_all('a', href=re.compile(r'../spieler/')):
-            player_text = link.get_text(strip=True)
-            name = normalize_player_name(player_text)
-            href = link.get('href')
-            
-            # Try to extract jersey number
-            jersey_number = None
-            jersey_match = re.search(r'^(\d+)', player_text)
-            if jersey_match:
-                jersey_number = int(jersey_match.group(1))
-            
-            player_id = self.get_or_create_player(name, href)
-            if player_id:
-                with self.conn, self.conn.cursor() as cur:
-                    try:
-                        cur.execute("""
-                            INSERT INTO public.Reserve_Players (match_id, player_id, jersey_number)
-                            VALUES (%s, %s, %s)
-                            ON CONFLICT (match_id, player_id) DO UPDATE SET
-                                jersey_number = COALESCE(EXCLUDED.jersey_number, public.Reserve_Players.jersey_number)
-                        """, (match_id, player_id, jersey_number))
-                    except Exception as e:
-                        self.logger.debug("Reserve player upsert failed (match %s, player %s): %s", 
-                                        match_id, player_id, e)
-
-    def _parse_enhanced_goals(self, match_id: int, soup: BeautifulSoup) -> None:
-        """Enhanced goal parsing with more detailed metadata."""
-        goals_header = soup.find('b', string=re.compile(r'Tore', re.IGNORECASE))
-        if not goals_header:
+    def store_match_details(self, match_id: int, parsed: Optional[Dict[str, Any]]) -> None:
+        """Write what parse_match_file found for a match: metadata, players and child rows."""
+        if parsed is None:
             return
         
-        goal_table = goals_header.find_next('table')
-        if not goal_table:
-            return
+        # Update match record (committed with the rest of the season)
+        updates = parsed['metadata']
+        if updates:
+            with self.conn.cursor() as cur:
+                set_clauses = [f"{key} = %s" for key in updates]
+                query = f"UPDATE public.Matches SET {', '.join(set_clauses)} WHERE match_id = %s"
+                cur.execute(query, [*updates.values(), match_id])
         
-        for cell in goal_table.find_all('td'):
-            entry = cell.get_text(strip=True)
-            if not entry or not re.search(r'\d+\.', entry):
+        # Resolve the player names in the order the parser looked them up
+        player_ids = {name: self.get_or_create_player(name, link) for name, link in parsed['players']}
+        for table, flags in _PLAYER_COLUMNS.items():
+            self._queue_rows(table, [
+                (match_id, *(player_ids[value] if is_player and value else value
+                             for value, is_player in zip(row, flags)))
+                for row in parsed[table]
+            ])
+    
+    def _queue_rows(self, table: str, rows: List[tuple]) -> None:
+        """Buffer child rows for a table and flush it once a full batch is waiting."""
+        pending = self.pending_rows[table]
+        rules = CHILD_UPSERTS[table][1]
+        for row in rows:
+            if rules is None:
+                pending[len(pending)] = row
                 continue
-            
-            # Enhanced goal parsing with more details
-            patterns = [
-                r"(\d+)\.\s*(\d+:\d+)\s*([^\(]+)(?:\s*\(([^\)]+)\))?",
-                r"(\d+)\.\s*(\d+:\d+)\s*([^,]+)(?:,\s*([^,]+))?"
-            ]
-            
-            for pattern in patterns:
-                match = re.match(pattern, entry)
-                if match:
-                    minute = int(match.group(1))
-                    score = match.group(2)
-                    scorer_text = normalize_player_name(match.group(3))
-                    additional_info = match.group(4) if len(match.groups()) >= 4 else None
-                    
-                    # Detect goal type
-                    is_penalty = any(keyword in entry.lower() for keyword in ['elfmeter', 'penalty', '11m', 'fe'])
-                    is_free_kick = any(keyword in entry.lower() for keyword in ['freistoß', 'freistoss', 'free kick'])
-                    is_header = any(keyword in entry.lower() for keyword in ['kopf', 'header', 'kopfball'])
-                    
-                    # Detect body part
-                    body_part = None
-                    if 'links' in entry.lower():
-                        body_part = 'left_foot'
-                    elif 'rechts' in entry.lower():
-                        body_part = 'right_foot'
-                    elif is_header:
-                        body_part = 'head'
-                    
-                    # Get scorer
-                    scorer_link = cell.find('a', href=re.compile(r'../spieler/'))
-                    if scorer_link:
-                        scorer_name = normalize_player_name(scorer_link.get_text(strip=True))
-                        scorer_href = scorer_link.get('href')
-                    else:
-                        scorer_name = scorer_text
-                        scorer_href = None
-                    
-                    # Parse assist information from additional_info
-                    assister_id = None
-                    assist_type = None
-                    if additional_info:
-                        assister_text = normalize_player_name(additional_info)
-                        if assister_text:
-                            assister_id = self.get_or_create_player(assister_text, None)
-                            # Try to detect assist type
-                            if 'flanke' in additional_info.lower():
-                                assist_type = 'cross'
-                            elif 'pass' in additional_info.lower():
-                                assist_type = 'pass'
-                            else:
-                                assist_type = 'assist'
-                    
-                    scorer_id = self.get_or_create_player(scorer_name, scorer_href)
-                    if scorer_id:
-                        with self.conn, self.conn.cursor() as cur:
-                            try:
-                                cur.execute("""
-                                    INSERT INTO public.Goals 
-                                    (match_id, player_id, goal_minute, is_penalty, is_own_goal,
-                                     is_free_kick, is_header, body_part, assist_type,
-                                     assisted_by_player_id, goal_description, score_at_time)
-                                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                                    ON CONFLICT (match_id, player_id, goal_minute, score_at_time) DO UPDATE SET
-                                        is_free_kick = EXCLUDED.is_free_kick,
-                                        is_header = EXCLUDED.is_header,
-                                        body_part = COALESCE(EXCLUDED.body_part, public.Goals.body_part),
-                                        assist_type = COALESCE(EXCLUDED.assist_type, public.Goals.assist_type),
-                                        goal_description = COALESCE(EXCLUDED.goal_description, public.Goals.goal_description)
-                                """, (match_id, scorer_id, minute, is_penalty, False,
-                                      is_free_kick, is_header, body_part, assist_type,
-                                      assister_id, entry, score))
-                            except Exception as e:
-                                self.logger.debug("Enhanced goal upsert failed (match %s): %s", match_id, e)
-                    break
-
-    def _parse_enhanced_substitutions(self, match_id: int, soup: BeautifulSoup) -> None:
-        """Enhanced substitution parsing with context and reasoning."""
-        all_text = soup.get_text(" ")
-        
-        # Enhanced substitution patterns
-        patterns = [
-            r"(\d+)\.\s+([^f]+)\s+für\s+([^\n]+)",
-            r"(\d+)\.\s*([^,]+),?\s*(?:für|for)\s+([^,\n]+)"
-        ]
+            key = tuple(value for value, rule in zip(row, rules) if rule == 'key')
+            previous = pending.get(key)
+            pending[key] = row if previous is None else merge_upsert_row(previous, row, rules)
         
-        for pattern in patterns:
-            for match in re.finditer(pattern, all_text):
-                minute = int(match.group(1))
-                player_in_text = normalize_player_name(match.group(2))
-                player_out_text = normalize_player_name(match.group(3))
-                
-                # Try to detect substitution reason from surrounding context
-                context_start = max(0, match.start() - 100)
-                context_end = min(len(all_text), match.end() + 100)
-                context = all_text[context_start:context_end].lower()
-                
-                reason = None
-                if any(word in context for word in ['verletzt', 'injury', 'injured']):
-                    reason = 'injury'
-                elif any(word in context for word in ['gelb', 'yellow', 'karte']):
-                    reason = 'yellow_card'
-                elif any(word in context for word in ['taktisch', 'tactical']):
-                    reason = 'tactical'
-                else:
-                    reason = 'tactical'  # Default assumption
-                
-                pid_in = self.get_or_create_player(player_in_text, None)
-                pid_out = self.get_or_create_player(player_out_text, None)
-                
-                if pid_in and pid_out:
-                    with self.conn, self.conn.cursor() as cur:
+        if len(pending) >= INSERT_BATCH_SIZE:
+            self.flush_rows(table)
+    
+    def flush_rows(self, table: Optional[str] = None) -> None:
+        """COPY buffered child rows into the staging tables and merge them into the real ones."""
+        for name in [table] if table else CHILD_UPSERTS:
+            pending = self.pending_rows[name]
+            if not pending:
+                continue
+            # The batch joins the season transaction; a savepoint lets a failed
+            # batch be retried row by row without aborting the rest of the season
+            with self.conn.cursor() as cur:
+                try:
+                    self._merge_rows(cur, name, pending.values())
+                except Exception as e:
+                    self.logger.debug("Batch upsert into %s failed (%d rows), retrying row by row: %s", name, len(pending), e)
+                    for row in pending.values():
                         try:
-                            cur.execute("""
-                                INSERT INTO public.Substitutions 
-                                (match_id, minute, player_in_id, player_out_id, substitution_reason)
-                                VALUES (%s, %s, %s, %s, %s)
-                                ON CONFLICT (match_id, minute, player_in_id, player_out_id) DO UPDATE SET
-                                    substitution_reason = COALESCE(EXCLUDED.substitution_reason, public.Substitutions.substitution_reason)
-                            """, (match_id, minute, pid_in, pid_out, reason))
+                            self._merge_rows(cur, name, [row])
                         except Exception as e:
-                            self.logger.debug("Enhanced substitution upsert failed (match %s): %s", match_id, e)
-
-    def _extract_match_events(self, match_id: int, soup: BeautifulSoup) -> None:
-        """Extract all match events for timeline reconstruction."""
-        events = []
-        
-        # This would be a comprehensive event extraction combining goals, cards, substitutions
-        # into a unified timeline - placeholder for now
-        all_text = soup.get_text()
-        
-        # Extract yellow cards
-        for match in re.finditer(r"(\d+)\.\s*([^,]+).*gelb", all_text, re.IGNORECASE):
-            minute = int(match.group(1))
-            player_name = normalize_player_name(match.group(2))
-            player_id = self.get_or_create_player(player_name, None)
-            if player_id:
-                events.append((match_id, minute, 'yellow_card', player_id, None, '{}', f"Yellow card: {player_name}"))
-        
-        # Store events
-        if events:
-            with self.conn, self.conn.cursor() as cur:
-                cur.executemany("""
-                    INSERT INTO public.Match_Events 
-                    (match_id, event_minute, event_type, player_id, secondary_player_id, event_details, event_description)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT DO NOTHING
-                """, events)
+                            self.logger.warning("Skipping %s row %s: %s", name, row, e)
+                            self.flush_failed = True
+            pending.clear()
+    
+    def _merge_rows(self, cur, table: str, rows) -> None:
+        """Stage rows and merge them into a child table, undoing both if anything fails."""
+        cur.execute("SAVEPOINT flush_rows")
+        try:
+            self._bulk_copy(cur, stage_table(table), CHILD_UPSERTS[table][0], rows)
+            for statement in stage_merge_statements(table):
+                cur.execute(statement)
+            cur.execute(f"TRUNCATE {stage_table(table)}")
+        except Exception:
+            cur.execute("ROLLBACK TO SAVEPOINT flush_rows")
+            raise
+        cur.execute("RELEASE SAVEPOINT flush_rows")
+    
+    def _bulk_copy(self, cur, table: str, columns: Tuple[str, ...], rows) -> None:
+        """COPY rows into a table through an in-memory tab-separated buffer."""
+        buf = io.StringIO()
+        for row in rows:
+            buf.write('\t'.join(map(copy_value, row)) + '\n')
+        buf.seek(0)
+        cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
 
     # Include original helper methods (get_or_create_*) here...
     def get_or_create_season(self, season_name: str, league_name: str) -> int:
@@ -863,16 +1240,22 @@ class EnhancedPGIngestor:
         name = normalize_player_name(name)
         if not name:
             return None
-        with self.conn, self.conn.cursor() as cur:
+        player_id = self.player_ids.get(name)
+        if player_id:
+            return player_id
+        with self.conn.cursor() as cur:
             cur.execute("SELECT player_id FROM public.Players WHERE player_name = %s", (name,))
             row = cur.fetchone()
             if row:
-                return row[0]
-            cur.execute(
-                "INSERT INTO public.Players (player_name, player_link) VALUES (%s, %s) RETURNING player_id",
-                (name, link),
-            )
-            return cur.fetchone()[0]
+                player_id = row[0]
+            else:
+                cur.execute(
+                    "INSERT INTO public.Players (player_name, player_link) VALUES (%s, %s) RETURNING player_id",
+                    (name, link),
+                )
+                player_id = cur.fetchone()[0]
+        self.player_ids[name] = player_id
+        return player_id
 
     def get_or_create_opponent(self, name: str, link: Optional[str]) -> int:
         name = normalize_text(name)
@@ -904,7 +1287,7 @@ class EnhancedPGIngestor:
 
     # Parse score method
     def parse_score(self, score_text: str) -> Tuple[Optional[int], Optional[int]]:
-        m = re.search(r"(\d+):(\d+)", score_text or "")
+        m = _SCORE_RE.search(score_text or "")
         if not m:
             return None, None
         return int(m.group(1)), int(m.group(2))
@@ -917,40 +1300,86 @@ class EnhancedPGIngestor:
         # Get seasons
         seasons = []
         for item in os.listdir(self.base_path):
-            if re.match(r"\d{4}-\d{2}", item) and (self.base_path / item).is_dir():
+            if _SEASON_DIR_RE.match(item) and (self.base_path / item).is_dir():
                 seasons.append(item)
         seasons.sort()
         
         self.logger.info("Processing %d seasons: %s to %s", len(seasons), seasons[0], seasons[-1])
         
-        # Process each season comprehensively
-        for season in seasons:
-            self.logger.info("Processing season %s", season)
-            season_dir = self.base_path / season
-            
-            # Discover all available files
-            files = self.discover_season_files(season_dir)
-            
-            # Process league matches
-            for overview_file in files['league_overview']:
-                matches_found = self.parse_season_overview_enhanced(overview_file, season)
-                self.stats['matches_found'] += matches_found
-                self.logger.info("  League overview %s: %d matches", overview_file.name, matches_found)
-            
-            # Process cup matches
-            for cup_file in files['cup_matches']:
-                matches_found = self.parse_cup_matches(cup_file, season)
-                self.stats['matches_found'] += matches_found
-                self.logger.info("  Cup matches %s: %d matches", cup_file.name, matches_found)
-            
-            # Process individual match details
-            for match_file in files['individual_matches'][:limit_matches] if limit_matches else files['individual_matches']:
-                # Get match_id from database based on file name
-                match_id = self.get_match_id_from_file(str(match_file))
-                if match_id:
-                    self.parse_enhanced_match_details(match_id, str(match_file))
-            
-            self.stats['seasons_processed'] += 1
+        try:
+            # Process each season comprehensively; one pool of parser processes serves them all
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+                for season in seasons:
+                    self.logger.info("Processing season %s", season)
+                    season_dir = self.base_path / season
+                
+                    # Discover all available files
+                    files = self.discover_season_files(season_dir)
+                
+                    # Process league matches
+                    for overview_file in files['league_overview']:
+                        matches_found = self.parse_season_overview_enhanced(overview_file, season)
+                        self.stats['matches_found'] += matches_found
+                        self.logger.info("  League overview %s: %d matches", overview_file.name, matches_found)
+                
+                    # Process cup matches
+                    for cup_file in files['cup_matches']:
+                        matches_found = self.parse_cup_matches(cup_file, season)
+                        self.stats['matches_found'] += matches_found
+                        self.logger.info("  Cup matches %s: %d matches", cup_file.name, matches_found)
+                
+                    # Process individual match details in one transaction per season
+                    try:
+                        self.flush_failed = False
+                        matches = []
+                        for match_file in files['individual_matches'][:limit_matches] if limit_matches else files['individual_matches']:
+                            # Skip files that have not changed since they were last ingested
+                            stat = match_file.stat()
+                            file_key = str(match_file.relative_to(self.base_path))
+                            file_state = [stat.st_mtime_ns, stat.st_size]
+                            if self.manifest.get(file_key) == file_state:
+                                self.stats['files_skipped'] += 1
+                                continue
+                        
+                            # Get match_id from database based on file name
+                            match_id = self.get_match_id_from_file(str(match_file))
+                            if match_id:
+                                matches.append((match_id, str(match_file), file_key, file_state))
+                    
+                        # Worker processes parse the files; results come back in order
+                        # and only this process talks to the database
+                        parsed_files = pool.map(parse_match_file, [path for _, path, _, _ in matches], chunksize=16)
+                        stored = []
+                        for (match_id, _, file_key, file_state), parsed in zip(matches, parsed_files):
+                            self.store_match_details(match_id, parsed)
+                            if parsed is not None:
+                                stored.append((file_key, file_state))
+                        self.flush_rows()
+                        self.conn.commit()
+                    except Exception:
+                        self.conn.rollback()
+                        # Players created in this season were rolled back with it
+                        self.player_ids.clear()
+                        raise
+                
+                    # Record the files this season's commit covered; unreadable files
+                    # and seasons with dropped rows are left for the next run
+                    if self.flush_failed:
+                        self.logger.warning("Season %s had dropped rows; its files stay out of the manifest", season)
+                    else:
+                        for file_key, file_state in stored:
+                            self.manifest[file_key] = file_state
+                        self._save_manifest()
+                
+                    self.stats['seasons_processed'] += 1
+        finally:
+            # Add what --reset left out, also when the load stops partway; if
+            # that fails too, the next run without --reset finishes the tables
+            if self.reset:
+                try:
+                    self.finalize_schema()
+                except psycopg2.Error as e:
+                    self.logger.error("Could not finalize the child tables: %s", e)
         
         self.logger.info("Enhanced ingestion complete. Stats: %s", self.stats)
 
@@ -994,14 +1423,14 @@ class EnhancedPGIngestor:
                 gameday += 1
                 
                 # More robust score and opponent extraction
-                score_link = row.find('a', href=re.compile(r'profiliga\d+\.html'))
+                score_link = row.find('a', href=_MATCH_LINK_RE)
                 if not score_link:
                     continue
                 
                 score_text = score_link.get_text(strip=True)
                 home_goals, away_goals = self.parse_score(score_text)
                 
-                opponent_link = row.find('a', href=re.compile(r'../gegner/'))
+                opponent_link = row.find('a', href=_OPPONENT_LINK_RE)
                 if not opponent_link:
                     continue
                 
@@ -1067,7 +1496,7 @@ class EnhancedPGIngestor:
 
     def get_match_id_from_file(self, file_path: str) -> Optional[int]:
         """Get match_id from database based on file path."""
-        with self.conn, self.conn.cursor() as cur:
+        with self.conn.cursor() as cur:
             cur.execute("SELECT match_id FROM public.Matches WHERE match_details_url = %s", (file_path,))
             row = cur.fetchone()
             return row[0] if row else None
@@ -24,6 +24,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Match IDs per DELETE statement
+DELETE_BATCH_SIZE = 1000
+
 
 def find_duplicate_matches(pg_conn):
     """Find duplicate matches."""
@@ -118,15 +121,16 @@ def remove_duplicates(pg_conn, duplicates, dry_run=False):
     
     # Actually delete
     with pg_conn.cursor() as cur:
-        placeholders = ','.join(['%s'] * len(deleted_ids))
-        
-        # Delete will CASCADE to related tables (goals, lineups, cards, subs)
-        cur.execute(f"""
-            DELETE FROM public.matches
-            WHERE match_id IN ({placeholders})
-        """, deleted_ids)
+        # Delete will CASCADE to related tables (goals, lineups, cards, subs).
+        # One array parameter per batch instead of an ever-growing IN list
+        deleted_count = 0
+        for start in range(0, len(deleted_ids), DELETE_BATCH_SIZE):
+            cur.execute("""
+                DELETE FROM public.matches
+                WHERE match_id = ANY(%s)
+            """, (deleted_ids[start:start + DELETE_BATCH_SIZE],))
+            deleted_count += cur.rowcount
         
-        deleted_count = cur.rowcount
         print(f"  ✓ Deleted {deleted_count} duplicate matches")
     
     pg_conn.commit()
@@ -22,6 +22,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Match IDs per DELETE statement
+DELETE_BATCH_SIZE = 1000
+
 
 def find_duplicates_by_opponent(pg_conn, season_label='2016-17', competition='Bundesliga'):
     """Find duplicate matches by grouping by opponent and score."""
@@ -120,13 +123,15 @@ def delete_matches(pg_conn, match_ids, dry_run=False):
         return
     
     with pg_conn.cursor() as cur:
-        placeholders = ','.join(['%s'] * len(match_ids))
-        cur.execute(f"""
-            DELETE FROM public.matches
-            WHERE match_id IN ({placeholders})
-        """, match_ids)
+        # One array parameter per batch instead of an ever-growing IN list
+        deleted = 0
+        for start in range(0, len(match_ids), DELETE_BATCH_SIZE):
+            cur.execute("""
+                DELETE FROM public.matches
+                WHERE match_id = ANY(%s)
+            """, (match_ids[start:start + DELETE_BATCH_SIZE],))
+            deleted += cur.rowcount
         
-        deleted = cur.rowcount
         print(f"  ✓ Deleted {deleted} matches")
     
     pg_conn.commit()
@@ -15,8 +15,9 @@ import os
 import sqlite3
 import sys
 from datetime import datetime
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import psycopg2
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,7 +30,6 @@ class EuroMatchSyncer:
         self.sqlite_path = sqlite_path
         self.dry_run = dry_run
         self.sqlite_conn = sqlite3.connect(sqlite_path)
-        self.sqlite_conn.row_factory = sqlite3.Row
         self.pg_conn = psycopg2.connect(os.getenv("DB_URL"))
         
         # ID mappings from SQLite to Postgres
@@ -39,6 +39,9 @@ class EuroMatchSyncer:
         self.competition_id_map: Dict[int, int] = {}
         self.season_comp_id_map: Dict[int, int] = {}
         
+        # Postgres (team_id, name) of FSV Mainz 05, looked up on first use
+        self._fsv_mainz_team: Optional[Tuple[int, str]] = None
+        
     def close(self):
         """Close database connections."""
         self.sqlite_conn.close()
@@ -71,9 +74,9 @@ class EuroMatchSyncer:
         """)
         
         sqlite_matches = {}
-        for row in sqlite_cur.fetchall():
-            key = f"{row['season']}|{row['home_team']}|{row['away_team']}|{row['home_score']}|{row['away_score']}|{row['match_date']}"
-            sqlite_matches[key] = row['match_id']
+        for season, home_team, away_team, home_score, away_score, match_date, match_id in sqlite_cur:
+            key = f"{season}|{home_team}|{away_team}|{home_score}|{away_score}|{match_date}"
+            sqlite_matches[key] = match_id
         
         # Get from Postgres
         with self.pg_conn.cursor() as pg_cur:
@@ -110,29 +113,29 @@ class EuroMatchSyncer:
         # Map teams (with special handling for FSV Mainz 05)
         with self.pg_conn.cursor() as pg_cur:
             pg_cur.execute("SELECT team_id, name, normalized_name FROM public.teams")
-            pg_teams_data = pg_cur.fetchall()
-            pg_teams = {(row[1], row[2]): row[0] for row in pg_teams_data}
-            # Also create a normalized name lookup
-            pg_teams_by_norm = {row[2]: (row[0], row[1]) for row in pg_teams_data}
+            # Exact and normalized-name lookups in one pass
+            pg_teams, pg_teams_by_norm = {}, {}
+            for pg_id, pg_name, pg_norm in pg_cur:
+                pg_teams[(pg_name, pg_norm)] = pg_id
+                pg_teams_by_norm[pg_norm] = (pg_id, pg_name)
         
         sqlite_cur = self.sqlite_conn.execute("SELECT team_id, name, normalized_name FROM teams")
-        for row in sqlite_cur.fetchall():
+        for team_id, name, normalized_name in sqlite_cur:
             # Try exact match first
-            pg_id = pg_teams.get((row['name'], row['normalized_name']))
+            pg_id = pg_teams.get((name, normalized_name))
             if pg_id:
-                self.team_id_map[row['team_id']] = pg_id
+                self.team_id_map[team_id] = pg_id
             # Special case: FSV in local = 1. FSV Mainz 05 in Postgres
-            elif row['name'] == 'FSV' and row['normalized_name'] == 'fsv':
-                # Find the Mainz team in Postgres
-                for (pg_name, pg_norm), pg_id in pg_teams.items():
-                    if 'fsv mainz' in pg_norm.lower():
-                        self.team_id_map[row['team_id']] = pg_id
-                        print(f"    Mapped FSV (local) → {pg_name} (Postgres)")
-                        break
+            elif name == 'FSV' and normalized_name == 'fsv':
+                fsv_mainz = self.find_fsv_mainz_team()
+                if fsv_mainz:
+                    pg_id, pg_name = fsv_mainz
+                    self.team_id_map[team_id] = pg_id
+                    print(f"    Mapped FSV (local) → {pg_name} (Postgres)")
             # Try normalized name match as fallback
-            elif row['normalized_name'] in pg_teams_by_norm:
-                pg_id, pg_name = pg_teams_by_norm[row['normalized_name']]
-                self.team_id_map[row['team_id']] = pg_id
+            elif normalized_name in pg_teams_by_norm:
+                pg_id, pg_name = pg_teams_by_norm[normalized_name]
+                self.team_id_map[team_id] = pg_id
         
         print(f"  Mapped {len(self.team_id_map)} teams")
         
@@ -142,10 +145,10 @@ class EuroMatchSyncer:
             pg_players = {(row[1], row[2]): row[0] for row in pg_cur.fetchall()}
         
         sqlite_cur = self.sqlite_conn.execute("SELECT player_id, name, normalized_name FROM players")
-        for row in sqlite_cur.fetchall():
-            pg_id = pg_players.get((row['name'], row['normalized_name']))
+        for player_id, name, normalized_name in sqlite_cur:
+            pg_id = pg_players.get((name, normalized_name))
             if pg_id:
-                self.player_id_map[row['player_id']] = pg_id
+                self.player_id_map[player_id] = pg_id
         
         print(f"  Mapped {len(self.player_id_map)} players")
         
@@ -155,10 +158,10 @@ class EuroMatchSyncer:
             pg_seasons = {row[1]: row[0] for row in pg_cur.fetchall()}
         
         sqlite_cur = self.sqlite_conn.execute("SELECT season_id, label FROM seasons")
-        for row in sqlite_cur.fetchall():
-            pg_id = pg_seasons.get(row['label'])
+        for season_id, label in sqlite_cur:
+            pg_id = pg_seasons.get(label)
             if pg_id:
-                self.season_id_map[row['season_id']] = pg_id
+                self.season_id_map[season_id] = pg_id
         
         print(f"  Mapped {len(self.season_id_map)} seasons")
         
@@ -168,13 +171,26 @@ class EuroMatchSyncer:
             pg_comps = {row[1]: row[0] for row in pg_cur.fetchall()}
         
         sqlite_cur = self.sqlite_conn.execute("SELECT competition_id, name FROM competitions")
-        for row in sqlite_cur.fetchall():
-            pg_id = pg_comps.get(row['name'])
+        for competition_id, name in sqlite_cur:
+            pg_id = pg_comps.get(name)
             if pg_id:
-                self.competition_id_map[row['competition_id']] = pg_id
+                self.competition_id_map[competition_id] = pg_id
         
         print(f"  Mapped {len(self.competition_id_map)} competitions")
     
+    def find_fsv_mainz_team(self) -> Optional[Tuple[int, str]]:
+        """Find the FSV Mainz 05 team in Postgres (cached once found)."""
+        if self._fsv_mainz_team is None:
+            with self.pg_conn.cursor() as pg_cur:
+                pg_cur.execute("""
+                    SELECT team_id, name FROM public.teams
+                    WHERE normalized_name ILIKE %s
+                    ORDER BY team_id
+                    LIMIT 1
+                """, ('%fsv mainz%',))
+                self._fsv_mainz_team = pg_cur.fetchone()
+        return self._fsv_mainz_team
+    
     def sync_missing_entities(self, match_ids: List[int]):
         """Sync teams and players that don't exist in Postgres yet."""
         # Get all teams involved in these matches that aren't mapped
@@ -187,38 +203,46 @@ class EuroMatchSyncer:
         """, match_ids)
         
         all_teams = sqlite_cur.fetchall()
-        new_teams = [t for t in all_teams if t['team_id'] not in self.team_id_map]
+        new_teams = [t for t in all_teams if t[0] not in self.team_id_map]
         
         if new_teams:
             if self.dry_run:
                 print(f"  [DRY RUN] Would add {len(new_teams)} new teams:")
-                for team in new_teams:
-                    print(f"    - {team['name']} ({team['normalized_name']})")
+                for _, name, normalized_name, _, _ in new_teams:
+                    print(f"    - {name} ({normalized_name})")
             else:
                 print(f"  Adding {len(new_teams)} new teams to Postgres...")
                 with self.pg_conn.cursor() as pg_cur:
-                    for team in new_teams:
-                        pg_cur.execute("""
-                            INSERT INTO public.teams (name, normalized_name, team_type, profile_url)
-                            VALUES (%s, %s, %s, %s)
-                            ON CONFLICT (name) DO UPDATE SET
-                                normalized_name = EXCLUDED.normalized_name,
-                                team_type = EXCLUDED.team_type,
-                                profile_url = EXCLUDED.profile_url
-                            RETURNING team_id
-                        """, (team['name'], team['normalized_name'], team['team_type'], team['profile_url']))
-                        result = pg_cur.fetchone()
-                        if result:
-                            self.team_id_map[team['team_id']] = result[0]
-                            print(f"    ✓ Added {team['name']}")
+                    # One multi-row INSERT; RETURNING name keys the new IDs
+                    # independently of the order Postgres returns them in
+                    returned = execute_values(pg_cur, """
+                        INSERT INTO public.teams (name, normalized_name, team_type, profile_url)
+                        VALUES %s
+                        ON CONFLICT (name) DO UPDATE SET
+                            normalized_name = EXCLUDED.normalized_name,
+                            team_type = EXCLUDED.team_type,
+                            profile_url = EXCLUDED.profile_url
+                        RETURNING name, team_id
+                    """, [team[1:] for team in new_teams],
+                        template="(%s, %s, %s, %s)", page_size=1000, fetch=True)
+                    pg_team_ids = dict(returned)
+                    for team_id, name, *_ in new_teams:
+                        pg_team_id = pg_team_ids.get(name)
+                        if pg_team_id:
+                            self.team_id_map[team_id] = pg_team_id
+                            print(f"    ✓ Added {name}")
                 self.pg_conn.commit()
         else:
             print("  All teams already exist in Postgres")
         
     def sync_match(self, sqlite_match_id: int):
         """Sync a single match with all its related data."""
+        # SELECT * rows are read by column name, so only this cursor uses sqlite3.Row
+        sqlite_cur = self.sqlite_conn.cursor()
+        sqlite_cur.row_factory = sqlite3.Row
+        
         # Get match data
-        match_data = self.sqlite_conn.execute("""
+        match_data = sqlite_cur.execute("""
             SELECT * FROM matches WHERE match_id = ?
         """, (sqlite_match_id,)).fetchone()
         
@@ -226,7 +250,7 @@ class EuroMatchSyncer:
             return
         
         # Get season_competition_id mapping
-        sc_data = self.sqlite_conn.execute("""
+        sc_data = sqlite_cur.execute("""
             SELECT sc.*, s.season_id, c.competition_id
             FROM season_competitions sc
             JOIN seasons s ON sc.season_id = s.season_id
@@ -248,10 +272,7 @@ class EuroMatchSyncer:
         
         # Get or create season_competition in Postgres
         with self.pg_conn.cursor() as pg_cur:
-            pg_cur.execute("""
-                SELECT season_competition_id FROM public.season_competitions
-                WHERE season_id = %s AND competition_id = %s
-            """, (pg_season_id, pg_comp_id))
+            pg_cur.execute("EXECUTE sel_season_comp (%s, %s)", (pg_season_id, pg_comp_id))
             result = pg_cur.fetchone()
             
             if result:
@@ -284,13 +305,7 @@ class EuroMatchSyncer:
         # Insert match
         with self.pg_conn.cursor() as pg_cur:
             pg_cur.execute("""
-                INSERT INTO public.matches (
-                    season_competition_id, round_name, matchday, leg, match_date, kickoff_time,
-                    venue, attendance, referee_id, home_team_id, away_team_id,
-                    home_score, away_score, halftime_home, halftime_away,
-                    extra_time_home, extra_time_away, penalties_home, penalties_away, source_file
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING match_id
+                EXECUTE ins_match (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """, (
                 pg_sc_id, match_data['round_name'], match_data['matchday'], match_data['leg'],
                 match_data['match_date'], match_data['kickoff_time'], match_data['venue'],
@@ -310,6 +325,31 @@ class EuroMatchSyncer:
         # TODO: Sync related data (lineups, goals, cards, substitutions)
         # This would require similar mapping logic for players
     
+    def prepare_statements(self):
+        """Prepare the per-match statements once so the server parses and plans them once."""
+        with self.pg_conn.cursor() as pg_cur:
+            pg_cur.execute("""
+                PREPARE sel_season_comp AS
+                SELECT season_competition_id FROM public.season_competitions
+                WHERE season_id = $1 AND competition_id = $2
+            """)
+            pg_cur.execute("""
+                PREPARE ins_match AS
+                INSERT INTO public.matches (
+                    season_competition_id, round_name, matchday, leg, match_date, kickoff_time,
+                    venue, attendance, referee_id, home_team_id, away_team_id,
+                    home_score, away_score, halftime_home, halftime_away,
+                    extra_time_home, extra_time_away, penalties_home, penalties_away, source_file
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20)
+                RETURNING match_id
+            """)
+    
+    def deallocate_statements(self):
+        """Release the statements created by prepare_statements()."""
+        with self.pg_conn.cursor() as pg_cur:
+            pg_cur.execute("DEALLOCATE sel_season_comp")
+            pg_cur.execute("DEALLOCATE ins_match")
+    
     def run_sync(self):
         """Run the complete sync process."""
         print("=" * 80)
@@ -358,9 +398,11 @@ class EuroMatchSyncer:
         
         # Sync matches
         print(f"\nStep 4: Syncing {len(missing_in_postgres)} matches...")
+        self.prepare_statements()
         for i, key in enumerate(missing_in_postgres, 1):
             print(f"\n[{i}/{len(missing_in_postgres)}] {key}")
             self.sync_match(sqlite_match_map[key])
+        self.deallocate_statements()
         
         print("\n" + "=" * 80)
         if self.dry_run:
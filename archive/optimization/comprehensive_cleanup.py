@@ -45,14 +45,18 @@ def clean_database(db_path: str):
     for category, entries in sorted(categories.items(), key=lambda x: len(x[1]), reverse=True):
         print(f'  - {len(entries):>4} {category}')
     
+    # Bind the IDs once through a temp table instead of repeating them in every IN list
+    cursor.execute('CREATE TEMP TABLE del_ids (pid INTEGER PRIMARY KEY)')
+    cursor.executemany('INSERT INTO del_ids VALUES (?)', [(pid,) for pid in to_delete])
+    
     # Strategy: Remove these from goals/assists tables, keep lineup if jersey numbers only
     print('\n2. Bereinige Tor-Tabelle...')
     
-    cursor.execute(f'''
+    cursor.execute('''
         DELETE FROM goals
-        WHERE player_id IN ({','.join('?' * len(to_delete))})
-        OR assist_player_id IN ({','.join('?' * len(to_delete))})
-    ''', list(to_delete) * 2)
+        WHERE player_id IN del_ids
+        OR assist_player_id IN del_ids
+    ''')
     
     goals_deleted = cursor.rowcount
     print(f'   ✓ {goals_deleted} Tor-Einträge entfernt')
@@ -74,21 +78,21 @@ def clean_database(db_path: str):
     
     print('\n4. Bereinige Substitutions-Tabelle...')
     
-    cursor.execute(f'''
+    cursor.execute('''
         DELETE FROM match_substitutions
-        WHERE player_on_id IN ({','.join('?' * len(to_delete))})
-        OR player_off_id IN ({','.join('?' * len(to_delete))})
-    ''', list(to_delete) * 2)
+        WHERE player_on_id IN del_ids
+        OR player_off_id IN del_ids
+    ''')
     
     subs_deleted = cursor.rowcount
     print(f'   ✓ {subs_deleted} Substitution-Einträge entfernt')
     
     print('\n5. Lösche ungültige Spieler...')
     
-    cursor.execute(f'''
+    cursor.execute('''
         DELETE FROM players
-        WHERE player_id IN ({','.join('?' * len(to_delete))})
-    ''', list(to_delete))
+        WHERE player_id IN del_ids
+    ''')
     
     players_deleted = cursor.rowcount
     print(f'   ✓ {players_deleted} Spieler-Einträge entfernt')
@@ -3,6 +3,7 @@ import os
 import re
 import sqlite3
 import unicodedata
+from functools import lru_cache
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -12,8 +13,12 @@ from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from bs4 import BeautifulSoup
 
 
+_WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^A-Za-z0-9 ]+")
+
+
 def normalize_whitespace(value: str) -> str:
-    return re.sub(r"\s+", " ", value.strip())
+    return _WS_RE.sub(" ", value.strip())
 
 
 def strip_accents(value: str) -> str:
@@ -21,17 +26,19 @@ def strip_accents(value: str) -> str:
     return "".join(ch for ch in normalized if not unicodedata.combining(ch))
 
 
+@lru_cache(maxsize=8192)
 def normalize_name(name: str) -> str:
     cleaned = strip_accents(name).replace(".", " ").replace("-", " ")
-    cleaned = re.sub(r"[^A-Za-z0-9 ]+", " ", cleaned)
+    cleaned = _NON_ALNUM_RE.sub(" ", cleaned)
     return normalize_whitespace(cleaned).lower()
 
 
+# Strip thousands separators in a single pass
+_STRIP_SEPS = str.maketrans("", "", ".,")
+
+
 def parse_int(value: str) -> Optional[int]:
-    value = value.strip()
-    if not value:
-        return None
-    value = value.replace(".", "").replace(",", "")
+    value = value.strip().translate(_STRIP_SEPS)
     if value.isdigit():
         return int(value)
     return None
@@ -1422,6 +1429,7 @@ class ComprehensiveFSVParser:
         self.mainz_team_id = self.db.get_or_create_team(MAINZ_TEAM_KEY, team_type="club")
         self.match_cache: Dict[Tuple[str, str], int] = {}
         self.players_processed: Dict[str, bool] = {}
+        self.profile_cache: Dict[Path, Dict] = {}
         self.player_file_index = self.build_player_index()
         self.logger = logging.getLogger(self.__class__.__name__)
         
@@ -2748,34 +2756,16 @@ class ComprehensiveFSVParser:
         return events
 
     # ---------------------------------------------------------------- player profiles
-    def parse_player_profile(self, player_name: str, season_path: Path) -> None:
-        normalized = normalize_name(player_name)
-        player_file = self.player_file_index.get(normalized)
-
-        if player_file is None:
-            for path in season_path.glob("spieler/*.html"):
-                if normalize_name(path.stem) == normalized:
-                    player_file = path
-                    self.player_file_index[normalized] = player_file
-                    break
-
-        if player_file is None or not player_file.exists():
-            return
+    def _read_player_profile(self, player_file: Path) -> Optional[Dict]:
+        """Parse a player profile page once; repeated calls hit ``profile_cache``."""
+        cached = self.profile_cache.get(player_file)
+        if cached is not None:
+            return cached
 
         soup = read_html(player_file)
         if soup is None:
-            return
+            return None
 
-        header = soup.find("b")
-        name = normalize_whitespace(header.get_text(" ", strip=True)) if header else player_name
-        
-        # Bereinige "?" am Anfang (wenn aus HTML extrahiert)
-        if name.startswith('?'):
-            name = name[1:].strip()
-        
-        # Bereinige "wdh." Präfixe
-        name = re.sub(r'^wdh\.\s*', '', name, flags=re.IGNORECASE).strip()
-        
         information = soup.get_text("\n", strip=True)
 
         # Parse birth date and place - use DOTALL flag to match across newlines
@@ -2832,6 +2822,55 @@ class ComprehensiveFSVParser:
         image = soup.find("img")
         image_url = image["src"] if image else None
 
+        # None = no career table on the page (existing careers are left untouched)
+        careers: Optional[List[Tuple[str, Optional[int], Optional[int]]]] = None
+        career_header = soup.find("b", string=re.compile("Laufbahn", re.IGNORECASE))
+        if career_header:
+            career_table = career_header.find_next("table")
+            if career_table:
+                careers = []
+                for row in career_table.find_all("tr"):
+                    cells = row.find_all("td")
+                    if len(cells) < 2:
+                        continue
+                    years_text = normalize_whitespace(cells[0].get_text(" ", strip=True))
+                    team_text = normalize_whitespace(cells[1].get_text(" ", strip=True))
+                    years_match = re.match(r"(\d{4})(?:-(\d{4}))?", years_text)
+                    start_year = int(years_match.group(1)) if years_match else None
+                    end_year = int(years_match.group(2)) if years_match and years_match.group(2) else None
+                    careers.append((team_text, start_year, end_year))
+
+        profile = {
+            "birth_date": birth_date,
+            "birth_place": birth_place,
+            "height_cm": height_cm,
+            "weight_kg": weight_kg,
+            "primary_position": primary_position,
+            "nationality": nationality,
+            "image_url": image_url,
+            "careers": careers,
+        }
+        self.profile_cache[player_file] = profile
+        return profile
+
+    def parse_player_profile(self, player_name: str, season_path: Path) -> None:
+        normalized = normalize_name(player_name)
+        player_file = self.player_file_index.get(normalized)
+
+        if player_file is None:
+            for path in season_path.glob("spieler/*.html"):
+                if normalize_name(path.stem) == normalized:
+                    player_file = path
+                    self.player_file_index[normalized] = player_file
+                    break
+
+        if player_file is None or not player_file.exists():
+            return
+
+        profile = self._read_player_profile(player_file)
+        if profile is None:
+            return
+
         # Find existing player by normalized surname and update with additional bio data
         # NOTE: Player was already created with full name from profile URL during lineup parsing
         cursor = self.db.conn.cursor()
@@ -2858,31 +2897,29 @@ class ComprehensiveFSVParser:
                 image_url = COALESCE(?, image_url)
             WHERE player_id = ?
             """,
-            (birth_date, birth_place, height_cm, weight_kg, primary_position, nationality, image_url, player_id),
+            (
+                profile["birth_date"],
+                profile["birth_place"],
+                profile["height_cm"],
+                profile["weight_kg"],
+                profile["primary_position"],
+                profile["nationality"],
+                profile["image_url"],
+                player_id,
+            ),
         )
         self.db.conn.commit()
 
-        career_header = soup.find("b", string=re.compile("Laufbahn", re.IGNORECASE))
-        if career_header:
-            career_table = career_header.find_next("table")
-            if career_table:
-                cursor.execute("DELETE FROM player_careers WHERE player_id = ?", (player_id,))
-                for row in career_table.find_all("tr"):
-                    cells = row.find_all("td")
-                    if len(cells) < 2:
-                        continue
-                    years_text = normalize_whitespace(cells[0].get_text(" ", strip=True))
-                    team_text = normalize_whitespace(cells[1].get_text(" ", strip=True))
-                    years_match = re.match(r"(\d{4})(?:-(\d{4}))?", years_text)
-                    start_year = int(years_match.group(1)) if years_match else None
-                    end_year = int(years_match.group(2)) if years_match and years_match.group(2) else None
-                    cursor.execute(
-                        """
-                        INSERT INTO player_careers (player_id, team_name, start_year, end_year)
-                        VALUES (?, ?, ?, ?)
-                        """,
-                        (player_id, team_text, start_year, end_year),
-                    )
+        if profile["careers"] is not None:
+            cursor.execute("DELETE FROM player_careers WHERE player_id = ?", (player_id,))
+            for team_text, start_year, end_year in profile["careers"]:
+                cursor.execute(
+                    """
+                    INSERT INTO player_careers (player_id, team_name, start_year, end_year)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (player_id, team_text, start_year, end_year),
+                )
         self.db.conn.commit()
 
     # ---------------------------------------------------------------- season squad